@@ -5,6 +5,8 @@ from sqlalchemy import pool
 
 from alembic import context
 from app.models.user_model import Base  # adjust "myapp.models" to the actual location of your Base
+from app.models import email_outbox_model  # noqa: F401 - registers the outbox table on Base.metadata
+from app.models import refresh_token_model  # noqa: F401 - registers the refresh token table on Base.metadata
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,26 @@
+"""add users created_at id index
+
+Revision ID: 3a7c2e91b4d5
+Revises: ef1d775276c0
+Create Date: 2026-10-17 09:12:44.103215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c2e91b4d5'
+down_revision: Union[str, None] = 'ef1d775276c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,34 @@
+"""add users filter indexes
+
+Revision ID: c4d2a8e61f93
+Revises: 5b9e3f7a1c20
+Create Date: 2026-10-17 15:02:37.518206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2a8e61f93'
+down_revision: Union[str, None] = '5b9e3f7a1c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_last_login_at_id', 'users', ['last_login_at', 'id'], unique=False)
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_locked_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_locked'))
+    op.create_index('ix_users_unverified_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('NOT email_verified'))
+    op.create_index('ix_users_professional_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_professional'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_professional_created_at_id', table_name='users', postgresql_where=sa.text('is_professional'))
+    op.drop_index('ix_users_unverified_created_at_id', table_name='users', postgresql_where=sa.text('NOT email_verified'))
+    op.drop_index('ix_users_locked_created_at_id', table_name='users', postgresql_where=sa.text('is_locked'))
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
+    op.drop_index('ix_users_last_login_at_id', table_name='users')
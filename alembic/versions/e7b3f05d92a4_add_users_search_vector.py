@@ -0,0 +1,35 @@
+"""add users search vector
+
+Revision ID: e7b3f05d92a4
+Revises: c4d2a8e61f93
+Create Date: 2026-10-17 16:41:09.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f05d92a4'
+down_revision: Union[str, None] = 'c4d2a8e61f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied rather than imported from the model so this revision keeps its meaning if the model changes.
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(nickname, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True), nullable=False))
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_search_vector', table_name='users', postgresql_using='gin')
+    op.drop_column('users', 'search_vector')
@@ -1,21 +1,295 @@
+from builtins import BaseException, Exception, ValueError, bool, dict, float, int, isinstance, len, max, min, round, str
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Sequence
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
+
+class PoolStats:
+    """Counters fed by pool events, read by the internal stats endpoint."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_peak = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        if timed_out:
+            self.timeouts += 1
+
+    def snapshot(self, pool=None) -> dict:
+        stats = {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "overflow_peak": self.overflow_peak,
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            })
+        return stats
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a free connection."""
+
+    stats: PoolStats = None
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - start, timed_out)
+                self.stats.overflow_peak = max(self.stats.overflow_peak, self.overflow())
+
+def effective_workers(settings) -> int:
+    """Worker process count, deriving it from the CPU count when server_workers is 0."""
+    if settings.server_workers > 0:
+        return settings.server_workers
+    return (os.cpu_count() or 1) * 2 + 1
+
+def pool_options(settings) -> dict:
+    """
+    Engine pool arguments from Settings.
+
+    With db_pool_size left at 0, the host-wide db_max_connections budget is divided across the
+    server workers, overflow included, so adding workers does not push Postgres past its
+    connection limit. Raises ValueError when there are more workers than connections to share,
+    and logs a warning when an explicit db_pool_size overshoots the budget.
+    """
+    workers = effective_workers(settings)
+    max_overflow = settings.db_max_overflow
+    pool_size = settings.db_pool_size
+    if pool_size <= 0:
+        per_worker = settings.db_max_connections // workers
+        if per_worker < 1:
+            raise ValueError(
+                f"db_max_connections={settings.db_max_connections} cannot give each of {workers} workers a connection; "
+                "raise it or lower server_workers"
+            )
+        max_overflow = min(max_overflow, per_worker // 2)
+        pool_size = per_worker - max_overflow
+    elif workers * (pool_size + max_overflow) > settings.db_max_connections:
+        logger.warning(
+            f"{workers} workers with db_pool_size={pool_size} and db_max_overflow={max_overflow} may open "
+            f"{workers * (pool_size + max_overflow)} connections, over db_max_connections={settings.db_max_connections}"
+        )
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+# Replication lag in seconds; 0 on a primary or on a replica that has replayed all it received.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class Replica:
+    """A read-only engine, its pool counters and what the last health probe found out about it."""
+
+    def __init__(self, url: str, engine, session_factory):
+        self.url = url
+        self.engine = engine
+        self.session_factory = session_factory
+        self.pool_stats = PoolStats()
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = 0.0
+
+    async def probe(self, timeout: float = 2.0):
+        """Measure replication lag, marking the replica unhealthy if it cannot be reached."""
+        try:
+            async with self.engine.connect() as connection:
+                result = await asyncio.wait_for(connection.execute(REPLICA_LAG_QUERY), timeout)
+                self.lag = float(result.scalar() or 0)
+            self.healthy = True
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Read replica {self.engine.url.host} failed its health check: {e}")
+            self.healthy = False
+        self.checked_at = time.monotonic()
+
+def _mark_write(session, *args):
+    state = session.info.get("request_state")
+    if state is not None:
+        state.db_wrote = True
+
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session)
+
+# Sessions opened by get_db carry the request state so writes can be flagged for read-your-writes.
+event.listen(Session, "after_flush", _mark_write)
+event.listen(Session, "do_orm_execute", _mark_dml)
+
+async def begin_read_only(session: AsyncSession):
+    """
+    Start the session's transaction as READ ONLY. Call it before the session runs anything.
+
+    Nothing in a read-only transaction needs committing, so read paths skip the COMMIT round trip
+    and a stray write fails loudly instead of landing on a replica.
+    """
+    await session.connection(execution_options={"postgresql_readonly": True})
+
+@asynccontextmanager
+async def write_transaction(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Commit once when the block finishes, or roll back if it raises."""
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
 
 class Database:
-    """Handles database connections and sessions."""
+    """Handles database connections and sessions, routing reads to healthy replicas when configured."""
     _engine = None
     _session_factory = None
+    _replicas: List[Replica] = []
+    _next_replica = 0
+    _monitor: Optional[asyncio.Task] = None
+    max_replica_lag = 5.0
+    pool_stats = PoolStats()
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
-        """Initialize the async engine and sessionmaker."""
+    def initialize(cls, database_url: str, echo: bool = False, pool_options: Optional[dict] = None,
+                   replica_urls: Sequence[str] = (), max_replica_lag: float = 5.0):
+        """Initialize the primary and replica async engines and their sessionmakers."""
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            cls._engine = create_async_engine(
+                database_url, echo=echo, future=True, poolclass=InstrumentedQueuePool, **(pool_options or {})
+            )
+            cls._instrument(cls._engine, cls.pool_stats)
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
+            cls._replicas = []
+            for url in replica_urls:
+                engine = create_async_engine(
+                    url, echo=echo, future=True, poolclass=InstrumentedQueuePool, **(pool_options or {})
+                )
+                # Marked so callers can tell a replica's possibly lagging reads from the primary's.
+                factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, future=True, info={"replica": True})
+                replica = Replica(url, engine, factory)
+                cls._instrument(engine, replica.pool_stats)
+                cls._replicas.append(replica)
+            cls.max_replica_lag = max_replica_lag
+
+    @classmethod
+    def _instrument(cls, engine, stats: PoolStats):
+        engine.sync_engine.pool.stats = stats
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            stats.connects += 1
+
+        @event.listens_for(engine.sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            stats.checkouts += 1
+
+        @event.listens_for(engine.sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            stats.checkins += 1
+
+        @event.listens_for(engine.sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            stats.invalidations += 1
+
+    @classmethod
+    def get_pool_stats(cls) -> dict:
+        """Return the primary's pool counters plus the live size, checked-out and overflow figures."""
+        pool = cls._engine.sync_engine.pool if cls._engine is not None else None
+        return cls.pool_stats.snapshot(pool)
+
+    @classmethod
+    def get_read_session_factory(cls):
+        """
+        Returns a session factory for read-only work: the next healthy replica within the lag
+        limit, round-robin, or the primary when none qualifies.
+        """
+        eligible = [r for r in cls._replicas if r.healthy and r.lag <= cls.max_replica_lag]
+        if not eligible:
+            return cls.get_session_factory()
+        cls._next_replica = (cls._next_replica + 1) % len(eligible)
+        return eligible[cls._next_replica].session_factory
+
+    @classmethod
+    async def check_replicas(cls):
+        """Probe every replica once."""
+        await asyncio.gather(*(replica.probe() for replica in cls._replicas))
+
+    @classmethod
+    async def start_replica_monitor(cls, interval: float):
+        """Probe replicas now, then keep probing every `interval` seconds in the background."""
+        if not cls._replicas or cls._monitor is not None:
+            return
+        await cls.check_replicas()
+
+        async def monitor():
+            while True:
+                await asyncio.sleep(interval)
+                await cls.check_replicas()
+
+        cls._monitor = asyncio.create_task(monitor())
+
+    @classmethod
+    async def stop_replica_monitor(cls):
+        if cls._monitor is not None:
+            cls._monitor.cancel()
+            cls._monitor = None
+
+    @classmethod
+    def get_replica_status(cls) -> List[dict]:
+        """Health, lag and pool counters of each replica engine."""
+        return [
+            {
+                "host": replica.engine.url.host,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag,
+                "pool": replica.pool_stats.snapshot(replica.engine.sync_engine.pool),
+            }
+            for replica in cls._replicas
+        ]
 
     @classmethod
     def get_session_factory(cls):
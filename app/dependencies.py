@@ -1,26 +1,52 @@
 from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import Database
+from app.database import Database, begin_read_only
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import decode_token
-from settings.config import Settings
+from settings.config import Settings, get_settings, reload_settings
 from fastapi import Depends
 
-def get_settings() -> Settings:
-    """Return application settings."""
-    return Settings()
-
 def get_email_service() -> EmailService:
     template_manager = TemplateManager()
     return EmailService(template_manager=template_manager)
 
-async def get_db() -> AsyncSession:
-    """Dependency that provides a database session for each request."""
+async def get_db(request: Request) -> AsyncSession:
+    """Dependency that provides a primary database session for each request."""
     async_session_factory = Database.get_session_factory()
     async with async_session_factory() as session:
+        session.info["request_state"] = request.state
+        try:
+            yield session
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+def get_session_factory():
+    """
+    Dependency for handlers that stream their response: sessions from `get_db` are closed before
+    the body is sent, so such handlers open their own from this factory.
+    """
+    return Database.get_session_factory()
+
+def get_read_session_factory(request: Request):
+    """Like `get_session_factory`, but for streamed reads, routed as `get_read_db` routes them."""
+    if getattr(request.state, "read_primary", False):
+        return Database.get_session_factory()
+    return Database.get_read_session_factory()
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency that provides a READ ONLY session for read-only endpoints, served by a healthy
+    replica unless the client wrote recently and must read its own writes from the primary.
+    """
+    if getattr(request.state, "read_primary", False):
+        async_session_factory = Database.get_session_factory()
+    else:
+        async_session_factory = Database.get_read_session_factory()
+    async with async_session_factory() as session:
+        await begin_read_only(session)
         try:
             yield session
         except Exception as e:
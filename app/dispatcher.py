@@ -0,0 +1,55 @@
+"""
+Email outbox dispatcher.
+
+Run with `python -m app.dispatcher`. Each dispatcher repeatedly claims a batch of queued emails
+from the `email_outbox` table, renders and sends them concurrently through the pooled SMTP
+client, and records the outcome. Claims use FOR UPDATE SKIP LOCKED, so throughput scales by
+starting more dispatcher processes alongside the API.
+"""
+import asyncio
+import logging
+import signal
+from app.database import Database, pool_options
+from app.dependencies import get_email_service, get_settings
+from app.services.email_service import shared_smtp_client
+from app.services.outbox_service import OutboxService
+from app.utils.common import setup_logging
+
+logger = logging.getLogger(__name__)
+
+async def run_dispatcher(stop: asyncio.Event):
+    settings = get_settings()
+    Database.initialize(settings.database_url, settings.debug, pool_options(settings))
+    session_factory = Database.get_session_factory()
+    email_service = get_email_service()
+    logger.info("Email dispatcher started")
+    try:
+        while not stop.is_set():
+            try:
+                async with session_factory() as session:
+                    claimed = await OutboxService.dispatch_batch(session, email_service)
+            except Exception as e:
+                logger.error(f"Email dispatch failed: {e}")
+                claimed = 0
+            if claimed == 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), settings.outbox_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await shared_smtp_client.close()
+        logger.info("Email dispatcher stopped")
+
+def main():
+    setup_logging()
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        loop.run_until_complete(run_dispatcher(stop))
+    finally:
+        loop.close()
+
+if __name__ == "__main__":
+    main()
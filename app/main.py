@@ -1,9 +1,15 @@
-from builtins import Exception
+from builtins import AttributeError, Exception, NotImplementedError, RuntimeError, ValueError
+import asyncio
+import signal
 from fastapi import FastAPI
 from starlette.responses import JSONResponse
-from app.database import Database
-from app.dependencies import get_settings
-from app.routers import user_routes
+from app.database import Database, pool_options
+from app.dependencies import get_settings, reload_settings
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.routers import admin_routes, user_routes
+from app.services.email_service import shared_smtp_client
+from app.services.password_service import PasswordHashingBusy, bulk_password_hasher, password_hasher
 from app.utils.api_description import getDescription
 app = FastAPI(
     title="User Management",
@@ -20,12 +26,38 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url, settings.debug, pool_options(settings),
+        settings.database_replica_urls, settings.replica_max_lag,
+    )
+    await Database.start_replica_monitor(settings.replica_check_interval)
+    # Only signalled in a single-process uvicorn run; under app.server the gunicorn master takes
+    # SIGHUP and restarts the workers instead (see app.server.on_reload).
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_settings)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        pass  # no SIGHUP on this platform, or not running in the main thread
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await Database.stop_replica_monitor()
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
+    await shared_smtp_client.close()
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"message": "Server is busy, please retry shortly."}, headers={"Retry-After": "1"})
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
+app.add_middleware(ReadYourWritesMiddleware)
+# Added last so it runs first: over-limit requests are turned away before anything else runs.
+app.add_middleware(RateLimitMiddleware)
+
 app.include_router(user_routes.router)
+app.include_router(admin_routes.router)
 
 
@@ -0,0 +1,240 @@
+from builtins import AttributeError, ValueError, dict, float, int, isinstance, len, max, min, range, str
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.jwt_service import decode_token
+from settings.config import Settings, get_settings
+
+# Account fields are looked for only in bodies up to this size; larger ones are limited by IP alone.
+MAX_ACCOUNT_BODY = 16 * 1024
+# Slots examined for a key before the stalest of them is taken over.
+PROBE_LIMIT = 8
+
+class Rate(NamedTuple):
+    """A bucket holding `burst` tokens that refills completely every `seconds`."""
+    burst: int
+    seconds: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse a "burst/seconds" setting such as "10/60"."""
+        burst, _, seconds = value.partition("/")
+        rate = cls(int(burst), float(seconds))
+        if rate.burst < 1 or rate.seconds <= 0:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        return rate
+
+class RatePolicy(NamedTuple):
+    name: str
+    per_ip: Rate
+    per_account: Rate
+
+# Routes that hash a password or mint tokens, by (method, path); everything else is a read or a write.
+AUTH_ROUTES = {("POST", "/login/"), ("POST", "/register/"), ("POST", "/token/refresh"), ("POST", "/token/revoke")}
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Body field naming the account on routes that have no bearer token yet.
+ACCOUNT_FIELDS = {("POST", "/login/"): "username", ("POST", "/register/"): "email"}
+
+def policies(settings: Settings) -> dict:
+    auth = RatePolicy("auth", Rate.parse(settings.rate_limit_auth_ip), Rate.parse(settings.rate_limit_auth_account))
+    write = Rate.parse(settings.rate_limit_write)
+    read = Rate.parse(settings.rate_limit_read)
+    return {"auth": auth, "write": RatePolicy("write", write, write), "read": RatePolicy("read", read, read)}
+
+def route_policy(method: str, path: str) -> str:
+    if (method, path) in AUTH_ROUTES or path.startswith("/verify-email/"):
+        return "auth"
+    return "read" if method in READ_METHODS else "write"
+
+def default_store_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "user-management-rate-limits")
+
+class SharedBuckets:
+    """
+    Token buckets in a memory-mapped file, shared by every process on the host that opens it.
+
+    The file is an open-addressed table of (key, tokens, updated_at) slots. Each `take` runs
+    under an exclusive flock on the file, so workers see one another's spending; the critical
+    section is a few slot reads and writes. When a key's probe window is full, the slot idle
+    longest is reused, which at worst hands a long-idle key a fresh bucket.
+    """
+    SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            # Never shrink: workers configured differently still agree on the table size.
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+            size = os.fstat(self.fd).st_size
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.slots = size // self.SLOT.size
+        self.map = mmap.mmap(self.fd, self.slots * self.SLOT.size)
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+    @staticmethod
+    def key(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little") or 1
+
+    def _find(self, key: int) -> Tuple[int, bool]:
+        """The offset of `key`'s slot and whether it already holds the key."""
+        start = key % self.slots
+        stalest, stalest_at = None, math.inf
+        for i in range(min(PROBE_LIMIT, self.slots)):
+            offset = (start + i) % self.slots * self.SLOT.size
+            slot_key, _, updated_at = self.SLOT.unpack_from(self.map, offset)
+            if slot_key == key:
+                return offset, True
+            if slot_key == 0:
+                return offset, False
+            if updated_at < stalest_at:
+                stalest, stalest_at = offset, updated_at
+        return stalest, False
+
+    def take(self, buckets: Sequence[Tuple[str, Rate]], now: Optional[float] = None) -> float:
+        """
+        Take a token from every bucket, or from none of them.
+
+        :param buckets: (key, rate) pairs; a new key starts with a full bucket.
+        :return: 0 if the tokens were taken, otherwise the seconds until all buckets have one.
+        """
+        now = time.time() if now is None else now
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            found: List[Tuple[int, int, float, Rate]] = []
+            wait = 0.0
+            for name, rate in buckets:
+                key = self.key(name)
+                offset, existing = self._find(key)
+                tokens = float(rate.burst)
+                if existing:
+                    _, tokens, updated_at = self.SLOT.unpack_from(self.map, offset)
+                    refill = rate.burst / rate.seconds
+                    tokens = min(float(rate.burst), tokens + max(0.0, now - updated_at) * refill)
+                    if tokens < 1:
+                        wait = max(wait, (1 - tokens) / refill)
+                found.append((offset, key, tokens, rate))
+            for offset, key, tokens, rate in found:
+                self.SLOT.pack_into(self.map, offset, key, tokens if wait else tokens - 1, now)
+            return wait
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+class RateLimitMiddleware:
+    """
+    Rejects requests over their route's token-bucket limits with 429 and Retry-After, before
+    routing, so an over-limit request never reaches the database or the password hasher.
+
+    Each request spends from a per-IP bucket and, when the caller's account is known, a
+    per-account bucket of its route's policy: strict `auth` on login, registration and token
+    endpoints, looser `write` and `read` elsewhere. The account is the `username` of a login
+    form, the `email` of a registration body, or the subject of a valid bearer token. Buckets
+    live in a SharedBuckets file, so all workers on a host enforce one limit together.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._settings: Optional[Settings] = None
+        self._policies: dict = {}
+        self._store: Optional[SharedBuckets] = None
+        self._store_owner: Tuple[int, str] = (0, "")
+
+    def _configure(self, settings: Settings):
+        if settings is not self._settings:
+            self._policies = policies(settings)
+            self._settings = settings
+        # Opened per process: a flock inherited across fork would not exclude the parent.
+        owner = (os.getpid(), settings.rate_limit_store or default_store_path())
+        if owner != self._store_owner:
+            if self._store is not None and self._store_owner[0] == owner[0]:
+                self._store.close()
+            self._store = SharedBuckets(owner[1], settings.rate_limit_slots)
+            self._store_owner = owner
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        settings = get_settings()
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+        self._configure(settings)
+
+        method, path = scope["method"], scope["path"]
+        policy = self._policies[route_policy(method, path)]
+        client = scope.get("client")
+        buckets = [(f"{policy.name}:ip:{client[0] if client else ''}", policy.per_ip)]
+        field = ACCOUNT_FIELDS.get((method, path))
+        if field is not None:
+            account, receive = await self._body_account(receive, field)
+        else:
+            account = self._token_account(scope)
+        if account:
+            buckets.append((f"{policy.name}:account:{account.strip().lower()}", policy.per_account))
+
+        wait = self._store.take(buckets)
+        if wait:
+            response = JSONResponse(
+                status_code=429,
+                content={"message": "Too many requests, please retry later."},
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _body_account(receive: Receive, field: str) -> Tuple[Optional[str], Receive]:
+        """Read the request body to find `field`, returning a receive that replays it."""
+        messages: List[Message] = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False) or len(body) > MAX_ACCOUNT_BODY:
+                break
+
+        async def replay() -> Message:
+            return messages.pop(0) if messages else await receive()
+
+        if len(body) > MAX_ACCOUNT_BODY or not body:
+            return None, replay
+        try:
+            if body.lstrip().startswith(b"{"):
+                value = json.loads(body).get(field)
+            else:
+                value = parse_qs(body.decode("latin-1")).get(field, [None])[0]
+        except (ValueError, AttributeError):
+            return None, replay
+        return (value if isinstance(value, str) else None), replay
+
+    @staticmethod
+    def _token_account(scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                claims = decode_token(token.strip())
+                subject = claims.get("sub") if claims else None
+                return subject if isinstance(subject, str) else None
+        return None
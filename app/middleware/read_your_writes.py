@@ -0,0 +1,54 @@
+from builtins import float, int, str
+import time
+from http.cookies import CookieError, SimpleCookie
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from settings.config import get_settings
+
+COOKIE_NAME = "rw_primary_until"
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client on the primary database for a short window after it writes.
+
+    A request whose session wrote anything gets a cookie holding the end of the window;
+    while it is valid, `get_read_db` hands out primary sessions instead of replica ones, so a
+    client never reads back data older than its own last write. The cookie travels with the
+    client, so this holds no matter which worker serves the next request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        now = time.time()
+        state["read_primary"] = self._primary_until(scope) > now
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and state.get("db_wrote"):
+                window = get_settings().read_your_writes_window
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{COOKIE_NAME}={time.time() + window:.3f}; Max-Age={int(window) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _primary_until(scope: Scope) -> float:
+        for name, value in scope.get("headers", ()):
+            if name != b"cookie":
+                continue
+            try:
+                morsel = SimpleCookie(value.decode("latin-1")).get(COOKIE_NAME)
+                return float(morsel.value) if morsel is not None else 0.0
+            except (CookieError, ValueError):
+                return 0.0
+        return 0.0
@@ -0,0 +1,54 @@
+from builtins import int, str
+from datetime import datetime
+from enum import Enum
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, Index, Text, func, text, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class OutboxStatus(Enum):
+    """Delivery state of a queued email."""
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+class EmailOutbox(Base):
+    """
+    An email waiting to be sent, written in the same transaction as the change that caused it.
+
+    The dispatcher (`python -m app.dispatcher`) claims pending rows whose `available_at` has
+    passed, pushes `available_at` forward as a lease while it sends, and records the outcome.
+
+    Attributes:
+        id (UUID): Unique identifier for the message.
+        email_type (str): Template name understood by EmailService.send_user_email.
+        recipient (str): Address the email is sent to.
+        context (dict): Template variables, including the recipient under "email".
+        user_id (UUID): The user the email concerns, if any.
+        status (OutboxStatus): PENDING until sent, or FAILED once attempts are exhausted.
+        attempts (int): Number of delivery attempts made so far.
+        last_error (str): Error from the most recent failed attempt.
+        available_at (datetime): Earliest time the message may be claimed.
+        created_at (datetime): Timestamp when the message was queued.
+        sent_at (datetime): Timestamp when the message was delivered.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_pending", "available_at", postgresql_where=text("status = 'PENDING'")),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email_type: Mapped[str] = Column(String(50), nullable=False)
+    recipient: Mapped[str] = Column(String(255), nullable=False)
+    context: Mapped[dict] = Column(JSONB, nullable=False)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=True)
+    status: Mapped[OutboxStatus] = Column(SQLAlchemyEnum(OutboxStatus, name='OutboxStatus', create_constraint=False), default=OutboxStatus.PENDING, nullable=False)
+    attempts: Mapped[int] = Column(Integer, default=0, nullable=False)
+    last_error: Mapped[str] = Column(Text, nullable=True)
+    available_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox {self.email_type} to {self.recipient}, Status: {self.status.name}>"
@@ -0,0 +1,34 @@
+from builtins import str
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class RefreshToken(Base):
+    """
+    A refresh token that has been issued, keyed by the `jti` claim of the token itself.
+
+    Every refresh revokes the presented token and issues a successor in the same family. A
+    token that comes back after it was revoked means it leaked, so the whole family is revoked.
+
+    Attributes:
+        id (UUID): The token's `jti` claim.
+        user_id (UUID): The user the token was issued to.
+        family_id (UUID): Shared by every token rotated from the same login.
+        expires_at (datetime): When the token stops being accepted.
+        created_at (datetime): When the token was issued.
+        revoked_at (datetime): When the token was rotated or revoked; null while it is live.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken {self.id} for {self.user_id}, Revoked: {self.revoked_at is not None}>"
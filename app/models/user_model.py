@@ -3,9 +3,9 @@ from datetime import datetime
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    Column, Computed, String, Integer, DateTime, Boolean, Index, func, text, Enum as SQLAlchemyEnum
 )
-from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID, ENUM
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -16,6 +16,14 @@ class UserRole(Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+# Text config and document behind users.search_vector; UserService.search parses queries with the
+# same config. Changing either needs a migration that recreates the column.
+SEARCH_CONFIG = "english"
+SEARCH_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(nickname, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(bio, '')), 'B')"
+)
+
 class User(Base):
     """
     Represents a user within the application, corresponding to the 'users' table in the database.
@@ -42,6 +50,8 @@ class User(Base):
         is_locked (bool): Flag indicating if the account is locked.
         created_at (datetime): Timestamp when the user was created, set by the server.
         updated_at (datetime): Timestamp of the last update, set by the server.
+        search_vector (str): Generated tsvector of the names (weight A) and bio (weight B),
+            GIN-indexed for full-text search. Deferred, so ordinary loads never read it.
 
     Methods:
         lock_account(): Locks the user account.
@@ -52,6 +62,19 @@ class User(Base):
     """
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id); see UserService.list_users_by_cursor.
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # GET /users/ filters and sorts (UserService.filter_conditions, SORT_KEYS). Every sort key
+        # leads an index, so any filter combination can be an ordered index scan that stops at
+        # the page limit; the rare sides of the flags and each role get their own narrow index.
+        Index("ix_users_last_login_at_id", "last_login_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+        Index("ix_users_locked_created_at_id", "created_at", "id", postgresql_where=text("is_locked")),
+        Index("ix_users_unverified_created_at_id", "created_at", "id", postgresql_where=text("NOT email_verified")),
+        Index("ix_users_professional_created_at_id", "created_at", "id", postgresql_where=text("is_professional")),
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
@@ -73,6 +96,7 @@ class User(Base):
     verification_token = Column(String, nullable=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True), nullable=False, deferred=True)
 
 
     def __repr__(self) -> str:
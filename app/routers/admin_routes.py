@@ -0,0 +1,44 @@
+"""
+Operational endpoints for administrators. These expose process-level controls and are not part
+of the public user management API.
+"""
+
+from builtins import dict
+from fastapi import APIRouter, Depends
+from app.database import Database
+from app.dependencies import reload_settings, require_role
+from app.services.jwt_service import token_cache
+from app.services.user_service import user_cache
+
+router = APIRouter(prefix="/admin")
+
+@router.post("/settings/reload", name="reload_settings", tags=["Administration Requires (Admin Role)"])
+async def reload_settings_route(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Re-read the environment and .env into a new settings snapshot for this worker process.
+
+    Values only read at startup, such as the database URL and pool sizes, still need a restart.
+    The other workers keep their snapshot; to reload all of them, send SIGHUP to the gunicorn
+    master, which re-reads the settings and gracefully restarts every worker.
+    """
+    reload_settings()
+    return {"message": "Settings reloaded"}
+
+@router.get("/stats/db-pool", name="db_pool_stats", tags=["Administration Requires (Admin Role)"])
+async def db_pool_stats(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Connection pool counters for this worker process: checkouts, time spent waiting for a
+    connection, overflow, invalidations and the live pool size, plus the health and lag of
+    each read replica as of its last probe and the same pool counters for its engine.
+    """
+    return {**Database.get_pool_stats(), "replicas": Database.get_replica_status()}
+
+@router.get("/stats/token-cache", name="token_cache_stats", tags=["Administration Requires (Admin Role)"])
+async def token_cache_stats(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Size and hit/miss counters of this worker's verified access token cache."""
+    return token_cache.stats()
+
+@router.get("/stats/user-cache", name="user_cache_stats", tags=["Administration Requires (Admin Role)"])
+async def user_cache_stats(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Size and hit/miss counters of this worker's user record cache."""
+    return user_cache.stats()
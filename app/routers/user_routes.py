@@ -18,26 +18,139 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
-from datetime import timedelta
+from builtins import Exception, ValueError, bool, dict, int, isinstance, len, max, min, str
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
-from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import UserService
+from app.database import begin_read_only
+from app.dependencies import get_current_user, get_db, get_email_service, get_read_db, get_read_session_factory, get_session_factory, require_role
+from app.models.user_model import UserRole
+from app.schemas.pagination_schema import CountStrategy, EnhancedPagination
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
+from app.schemas.user_schemas import ExportFormat, LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserSearchResponse, UserSort, UserUpdate
+from app.services.user_service import EXPORT_COLUMNS, LoginOutcome, PreconditionFailed, UserService
 from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.services.refresh_token_service import RefreshTokenService
+from app.utils.bulk_io import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, DuplexStreamingResponse, csv_batch, iter_csv, iter_ndjson, ndjson_batch
+from app.utils.cursor import decode_cursor, decode_rank_cursor, encode_rank_cursor, page_cursors
+from app.utils.etag import etag_matches, user_etag
+from app.utils.serialization import FastJSONResponse, field_columns, pagination_links_to_dicts, parse_fields, user_to_dict, users_to_dicts
+from app.utils.link_generation import generate_cursor_pagination_links, generate_pagination_links, user_link_templates
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
 router = APIRouter()
+logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-settings = get_settings()
+
+def user_filters(
+    role: Optional[UserRole] = None,
+    is_locked: Optional[bool] = None,
+    email_verified: Optional[bool] = None,
+    is_professional: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    last_login_after: Optional[datetime] = None,
+    last_login_before: Optional[datetime] = None,
+) -> dict:
+    """Filter query parameters shared by the list and export endpoints; see `UserService.filter_conditions`."""
+    return dict(role=role, is_locked=is_locked, email_verified=email_verified, is_professional=is_professional,
+                created_after=created_after, created_before=created_before,
+                last_login_after=last_login_after, last_login_before=last_login_before)
+
+def filter_params(filters: dict) -> dict:
+    """The filters that are set, as query parameters for pagination links."""
+    params = {}
+    for name, value in filters.items():
+        if isinstance(value, bool):
+            params[name] = "true" if value else "false"
+        elif isinstance(value, datetime):
+            params[name] = value.isoformat()
+        elif isinstance(value, UserRole):
+            params[name] = value.value
+        elif value is not None:
+            params[name] = str(value)
+    return params
+
+@router.get(
+    "/users/export",
+    name="export_users",
+    tags=["User Management Requires (Admin or Manager Roles)"],
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}, "description": "Every matching user, oldest first."}},
+)
+async def export_users(
+    format: ExportFormat = ExportFormat.NDJSON,
+    filters: dict = Depends(user_filters),
+    session_factory = Depends(get_read_session_factory),
+    current_user: dict = Depends(require_role(["ADMIN"]))
+):
+    """
+    Stream every user matching the filters as NDJSON or CSV, oldest first.
+
+    Rows come from a server-side cursor in batches of `export_batch_size` and each batch is
+    written before the next is fetched, so memory stays flat however large the table is and a
+    slow client slows the scan rather than buffering it. Password hashes and verification
+    tokens are never exported.
+    """
+    columns = [column.key for column in EXPORT_COLUMNS]
+
+    async def rows():
+        if format is ExportFormat.CSV:
+            yield csv_batch([columns])
+        async with session_factory() as session:
+            await begin_read_only(session)
+            async for batch in UserService.stream_users(session, get_settings().export_batch_size, **filters):
+                yield csv_batch(batch) if format is ExportFormat.CSV else ndjson_batch(columns, batch)
+
+    media_type = CSV_MEDIA_TYPE if format is ExportFormat.CSV else NDJSON_MEDIA_TYPE
+    filename = f"users.{'csv' if format is ExportFormat.CSV else 'ndjson'}"
+    return StreamingResponse(rows(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.get("/users/search", response_model=UserSearchResponse, name="search_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def search_users(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description='Search text: words, "quoted phrases", or, and -word to exclude.'),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    links: bool = Query(True, description="Include HATEOAS links on each user; pass false to omit them."),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Search users by nickname, first and last name, and bio, best matches first.
+
+    Name matches rank above bio matches. Each result carries its `rank` and a `highlight`
+    of the matching text with matches wrapped in `<mark>`. Follow the `next` link to page;
+    it seeks on (rank, id), so deep pages cost the same as the first.
+    """
+    try:
+        position = decode_rank_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    rows, has_more = await UserService.search(db, q, limit, position)
+    templates = user_link_templates(request) if links else None
+    items = []
+    for user, rank, highlight in rows:
+        item = user_to_dict(user, templates)
+        item["rank"] = rank
+        item["highlight"] = highlight
+        items.append(item)
+    next_cursor = encode_rank_cursor(rows[-1][1], rows[-1][0].id) if has_more else None
+    params = {"q": q} if links else {"q": q, "links": "false"}
+    return FastJSONResponse({
+        "items": items,
+        "size": len(items),
+        "links": pagination_links_to_dicts(generate_cursor_pagination_links(request, limit, cursor, next_cursor, None, params)),
+    })
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, links: bool = Query(True, description="Include HATEOAS links; pass false to omit them."), fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return, e.g. id,email,role."), db: AsyncSession = Depends(get_read_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -47,29 +160,42 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
-        db: Dependency that provides an AsyncSession for database access.
+        db: Dependency that provides a read-only AsyncSession, served by a replica when one is healthy.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
-    """
-    user = await UserService.get_by_id(db, user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=user.id,
-        nickname=user.nickname,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        bio=user.bio,
-        profile_picture_url=user.profile_picture_url,
-        github_profile_url=user.github_profile_url,
-        linkedin_profile_url=user.linkedin_profile_url,
-        role=user.role,
-        email=user.email,
-        last_login_at=user.last_login_at,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        links=create_user_links(user.id, request)  
-    )
+    The user is read through this worker's user cache (see `UserService.get_cached`), so
+    repeated reads of the same profile skip the database until the entry expires or is
+    invalidated by a write; clients pinned to the primary after a write bypass it. The
+    response carries a strong ETag specific to the requested `fields` and `links`, and a
+    request whose If-None-Match still matches is answered 304 without serializing the user;
+    on a cache miss that check reads only `updated_at`, and the full row is loaded only when
+    the tag differs. Pass `links=false` to leave out the links, or `fields` to return only the
+    named fields; the cached record already holds them all, so this trims the payload without
+    another query.
+    """
+    try:
+        fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # A client that wrote recently reads from the primary, past any copy cached before its write.
+    read_primary = getattr(request.state, "read_primary", False)
+    user = None if read_primary else UserService.peek_cached("id", user_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Revalidation needs only updated_at; the full row is loaded once the tag is known to differ.
+        version = user or await UserService.get_version(db, user_id)
+        if not version:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        etag = user_etag(version.id, version.updated_at, fields, links)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    if user is None:
+        user = await UserService.get_cached(db, "id", user_id, refresh=True)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    etag = user_etag(user.id, user.updated_at, fields, links)
+    return FastJSONResponse(user_to_dict(user, user_link_templates(request) if links else None, fields), headers={"ETag": etag})
 
 # Additional endpoints for update, delete, create, and list users follow a similar pattern, using
 # asynchronous database operations, handling security with OAuth2PasswordBearer, and enhancing response
@@ -85,27 +211,20 @@ async def update_user(user_id: UUID, user_update: UserUpdate, request: Request,
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+
+    Send the ETag from a previous GET as If-Match to update only if nobody changed the user in
+    the meantime; otherwise the update is refused with 412.
     """
     user_data = user_update.model_dump(exclude_unset=True)
-    updated_user = await UserService.update(db, user_id, user_data)
+    try:
+        updated_user = await UserService.update(db, user_id, user_data, if_match=request.headers.get("if-match"))
+    except PreconditionFailed:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified; fetch it again and retry")
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return UserResponse.model_construct(
-        id=updated_user.id,
-        bio=updated_user.bio,
-        first_name=updated_user.first_name,
-        last_name=updated_user.last_name,
-        nickname=updated_user.nickname,
-        email=updated_user.email,
-        last_login_at=updated_user.last_login_at,
-        profile_picture_url=updated_user.profile_picture_url,
-        github_profile_url=updated_user.github_profile_url,
-        linkedin_profile_url=updated_user.linkedin_profile_url,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at,
-        links=create_user_links(updated_user.id, request)
-    )
+    etag = user_etag(updated_user.id, updated_user.updated_at)
+    return FastJSONResponse(user_to_dict(updated_user, user_link_templates(request)), headers={"ETag": etag})
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, name="delete_user", tags=["User Management Requires (Admin or Manager Roles)"])
@@ -146,48 +265,152 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
     created_user = await UserService.create(db, user.model_dump(), email_service)
     if not created_user:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
-    
-    
-    return UserResponse.model_construct(
-        id=created_user.id,
-        bio=created_user.bio,
-        first_name=created_user.first_name,
-        last_name=created_user.last_name,
-        profile_picture_url=created_user.profile_picture_url,
-        nickname=created_user.nickname,
-        email=created_user.email,
-        last_login_at=created_user.last_login_at,
-        created_at=created_user.created_at,
-        updated_at=created_user.updated_at,
-        links=create_user_links(created_user.id, request)
-    )
 
+    return FastJSONResponse(user_to_dict(created_user, user_link_templates(request)), status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/users/bulk",
+    name="bulk_create_users",
+    tags=["User Management Requires (Admin or Manager Roles)"],
+    response_class=DuplexStreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One NDJSON result per input row, then a summary line."}},
+)
+async def bulk_create_users(
+    request: Request,
+    session_factory = Depends(get_session_factory),
+    email_service: EmailService = Depends(get_email_service),
+    current_user: dict = Depends(require_role(["ADMIN"]))
+):
+    """
+    Import users from an NDJSON (`application/x-ndjson`) or CSV (`text/csv`, with a header row)
+    request body.
+
+    The body is read as it arrives and processed in chunks of `bulk_import_chunk_size` rows,
+    each validated, hashed and inserted together (see `UserService.bulk_create`). Results
+    stream back as NDJSON, one line per input row in order, followed by a summary line. A
+    failed row does not stop the import.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type == CSV_MEDIA_TYPE:
+        records = iter_csv(request.stream())
+    elif media_type in (NDJSON_MEDIA_TYPE, "application/jsonl", "application/json"):
+        records = iter_ndjson(request.stream())
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Send NDJSON (application/x-ndjson) or CSV (text/csv)")
+    chunk_size = max(1, min(get_settings().bulk_import_chunk_size, 1000))
+
+    async def import_chunk(chunk):
+        try:
+            async with session_factory() as session:
+                return await UserService.bulk_create(session, chunk, email_service)
+        except Exception as e:
+            logger.error(f"Bulk import chunk failed: {e}")
+            return [{"row": row, "email": None, "status": "failed", "errors": ["could not be saved, retry this row"]} for row, _ in chunk]
+
+    async def results():
+        summary = {"created": 0, "failed": 0}
+        chunk = []
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) < chunk_size:
+                continue
+            for result in await import_chunk(chunk):
+                summary[result["status"]] += 1
+                yield json.dumps(result) + "\n"
+            chunk = []
+        if chunk:
+            for result in await import_chunk(chunk):
+                summary[result["status"]] += 1
+                yield json.dumps(result) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return DuplexStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
 
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
 async def list_users(
     request: Request,
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    links: bool = Query(True, description="Include HATEOAS links on each user; pass false to omit them."),
+    fields: Optional[str] = Query(None, description="Comma-separated UserResponse fields to return, e.g. id,email,role."),
+    sort: UserSort = Query(UserSort.CREATED_AT, description="Sort key; prefix with - for descending. Cursor paging supports created_at only."),
+    filters: dict = Depends(user_filters),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    """
+    List users.
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
-    
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
+    Pages by `skip`/`limit` by default. Passing `cursor` switches to keyset paging on
+    (created_at, id), which stays fast on deep pages and stable under concurrent inserts:
+    send an empty `cursor=` for the first page, then follow the `next`/`prev` links.
+
+    Rows are rendered straight to JSON without re-validation; see app.utils.serialization.
+    Each user carries its links unless `links=false` is passed. `fields` trims each user to
+    the named fields and loads only their columns.
+
+    Filter on role, lock and verification state, professional status, and created_at or
+    last_login_at ranges (`*_after` inclusive, `*_before` exclusive), and order by any
+    whitelisted `sort` key; each combination is served from an index. Filtered totals are
+    always exact. The pagination links keep every parameter.
+    """
+    try:
+        fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    strategy = CountStrategy(get_settings().user_count_strategy)
+    templates = user_link_templates(request) if links else None
+    columns = field_columns(fields) if fields is not None else None
+    params = {}
+    if not links:
+        params["links"] = "false"
+    if fields is not None:
+        params["fields"] = ",".join(fields)
+    if sort is not UserSort.CREATED_AT:
+        params["sort"] = sort.value
+    params.update(filter_params(filters))
+
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        if sort is not UserSort.CREATED_AT:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor paging only supports sort=created_at")
+        total_users, used_strategy = await UserService.count_users(db, strategy, **filters)
+        users, has_more = await UserService.list_users_by_cursor(db, limit, position, columns, **filters)
+        next_cursor, prev_cursor = page_cursors(users, position, has_more)
+        return FastJSONResponse({
+            "items": users_to_dicts(users, templates, fields),
+            "total": total_users,
+            "total_strategy": used_strategy,
+            "page": None,
+            "size": len(users),
+            "links": pagination_links_to_dicts(generate_cursor_pagination_links(request, limit, cursor, next_cursor, prev_cursor, params or None)),
+        })
+
+    if strategy is CountStrategy.WINDOW:
+        users, total_users = await UserService.list_users_with_total(db, skip, limit, columns, sort, **filters)
+        used_strategy = CountStrategy.WINDOW
+        if total_users is None:
+            total_users, used_strategy = await UserService.count_users(db, CountStrategy.EXACT, **filters)
+    else:
+        total_users, used_strategy = await UserService.count_users(db, strategy, **filters)
+        users = await UserService.list_users(db, skip, limit, columns, sort, **filters)
+
+    pagination_links = generate_pagination_links(request, skip, limit, total_users, params or None)
     
     # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
-        total=total_users,
-        page=skip // limit + 1,
-        size=len(user_responses),
-        links=pagination_links  # Ensure you have appropriate logic to create these links
-    )
+    return FastJSONResponse({
+        "items": users_to_dicts(users, templates, fields),
+        "total": total_users,
+        "total_strategy": used_strategy,
+        "page": skip // limit + 1,
+        "size": len(users),
+        "links": pagination_links_to_dicts(pagination_links),
+    })
 
 
 @router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
@@ -197,40 +420,60 @@ async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db
         return user
     raise HTTPException(status_code=400, detail="Email already exists")
 
+def _token_response(email: str, role: UserRole, refresh_token: str) -> dict:
+    access_token_expires = timedelta(minutes=get_settings().access_token_expire_minutes)
+
+    access_token = create_access_token(
+        data={"sub": email, "role": str(role.name)},
+        expires_delta=access_token_expires
+    )
+
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
-        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
+    outcome, user = await UserService.attempt_login(session, form_data.username, form_data.password)
+    refresh_token = RefreshTokenService.issue(session, user.id) if user else None
+    await session.commit()
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
+    if outcome is LoginOutcome.LOCKED:
+        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
     if user:
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
-
-        return {"access_token": access_token, "token_type": "bearer"}
+        return _token_response(user.email, user.role, refresh_token)
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
 @router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
-        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
+    outcome, user = await UserService.attempt_login(session, form_data.username, form_data.password)
+    refresh_token = RefreshTokenService.issue(session, user.id) if user else None
+    await session.commit()
 
-    user = await UserService.login_user(session, form_data.username, form_data.password)
+    if outcome is LoginOutcome.LOCKED:
+        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
     if user:
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
-
-        return {"access_token": access_token, "token_type": "bearer"}
+        return _token_response(user.email, user.role, refresh_token)
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
+@router.post("/token/refresh", response_model=TokenResponse, tags=["Login and Registration"])
+async def refresh_token(body: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+
+    The presented refresh token is revoked by the exchange. Presenting it again revokes every
+    token rotated from the same login, so a stolen refresh token stops working for both parties.
+    """
+    rotated = await RefreshTokenService.rotate(session, body.refresh_token)
+    if rotated is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.", headers={"WWW-Authenticate": "Bearer"})
+    user, new_refresh_token = rotated
+    return _token_response(user.email, user.role, new_refresh_token)
+
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT, tags=["Login and Registration"])
+async def revoke_token(body: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    """Sign out: revoke the presented refresh token and every token rotated from the same login."""
+    if not await RefreshTokenService.revoke(session, body.refresh_token):
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.", headers={"WWW-Authenticate": "Bearer"})
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
@@ -1,9 +1,17 @@
 import re
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, HttpUrl, validator, conint
 
+class CountStrategy(str, Enum):
+    """How the total of a paged listing is computed."""
+    EXACT = "exact"          # SELECT count(*) over the whole table
+    ESTIMATED = "estimated"  # planner row estimate from pg_class statistics
+    CACHED = "cached"        # exact count cached per process, adjusted on create/delete
+    WINDOW = "window"        # count(*) OVER () returned alongside the page rows
+
 # Pagination Model
 class Pagination(BaseModel):
     page: int = Field(..., description="Current page number.")
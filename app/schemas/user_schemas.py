@@ -6,6 +6,8 @@ from enum import Enum
 import uuid
 import re
 
+from app.schemas.link_schema import Link
+from app.schemas.pagination_schema import CountStrategy, PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 class UserRole(str, Enum):
@@ -14,6 +16,21 @@ class UserRole(str, Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class UserSort(str, Enum):
+    """Orderings GET /users/ accepts; a leading "-" sorts descending."""
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    LAST_LOGIN_AT = "last_login_at"
+    LAST_LOGIN_AT_DESC = "-last_login_at"
+    EMAIL = "email"
+    EMAIL_DESC = "-email"
+    NICKNAME = "nickname"
+    NICKNAME_DESC = "-nickname"
+
 def validate_url(url: Optional[str]) -> Optional[str]:
     if url is None or url.strip() == '':
         return None  # Standardize empty strings to None
@@ -169,6 +186,7 @@ class UserResponse(UserBase):
     nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=generate_nickname())    
     role: UserRole = Field(default=UserRole.AUTHENTICATED, example="AUTHENTICATED")
     is_professional: Optional[bool] = Field(default=False, example=True)
+    links: List[Link] = Field(default_factory=list, description="Actions available on this user; omitted when requested with `links=false`.")
 
 class LoginRequest(BaseModel):
     email: str = Field(..., example="john.doe@example.com")
@@ -188,5 +206,16 @@ class UserListResponse(BaseModel):
         "github_profile_url": "https://github.com/johndoe"
     }])
     total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    total_strategy: CountStrategy = Field(CountStrategy.EXACT, example="exact", description="How `total` was computed; estimated and cached totals may be approximate.")
+    page: Optional[int] = Field(None, example=1, description="Page number in offset mode; None when paging by cursor.")
+    size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list, description="Pagination links; cursor mode links carry opaque `cursor` tokens.")
+
+class UserSearchResult(UserResponse):
+    rank: float = Field(..., example=0.6, description="ts_rank_cd relevance; name matches weigh more than bio matches.")
+    highlight: str = Field(..., example="<mark>John</mark> Doe Experienced developer", description="Matching fragments, HTML-escaped, with matches wrapped in <mark>.")
+
+class UserSearchResponse(BaseModel):
+    items: List[UserSearchResult]
     size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list, description="`next` carries an opaque `cursor` token while more matches remain.")
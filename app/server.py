@@ -0,0 +1,69 @@
+"""
+Production API server.
+
+Run with `python -m app.server`. Gunicorn supervises `effective_workers` uvicorn worker
+processes on uvloop and httptools, so the API uses every core. The app is imported once in the
+master and forked into the workers, which then open their own database pools, SMTP connections,
+bcrypt pools (sized by `hash_workers` so together they share the cores) and rate limit store on
+first use. Each worker is restarted gracefully after `server_max_requests` requests (plus
+jitter, so they do not all restart together), which bounds slow memory growth. Every knob is a
+`server_*` setting.
+
+SIGHUP goes to the master, never to the workers: gunicorn reloads, re-reads the settings in the
+master (see `on_reload`) and replaces every worker with a fresh fork that sees them. The
+`server_*` settings themselves only change on a full restart.
+"""
+from builtins import dict, str
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+from app.database import effective_workers, pool_options
+from app.dependencies import get_settings
+from settings.config import Settings, reload_settings
+
+class AppWorker(UvicornWorker):
+    """Uvicorn worker using the event loop and HTTP parser named by the settings."""
+    CONFIG_KWARGS = {"loop": get_settings().server_loop, "http": get_settings().server_http, "lifespan": "on"}
+
+def on_reload(arbiter):
+    """Gunicorn hook run in the master on SIGHUP, before it forks the replacement workers."""
+    reload_settings()
+
+def server_options(settings: Settings) -> dict:
+    """Gunicorn configuration from Settings."""
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": effective_workers(settings),
+        "worker_class": "app.server.AppWorker",  # not __name__, which is __main__ under python -m
+        "preload_app": settings.server_preload,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "timeout": settings.server_timeout,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "keepalive": settings.server_keepalive,
+        "backlog": settings.server_backlog,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "accesslog": "-" if settings.server_access_log else None,
+        "errorlog": "-",
+        "on_reload": on_reload,
+    }
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+def main():
+    settings = get_settings()
+    pool_options(settings)  # refuse to start when the connection budget cannot cover the workers
+    Server(server_options(settings)).run()
+
+if __name__ == "__main__":
+    main()
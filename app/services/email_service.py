@@ -1,18 +1,29 @@
 # email_service.py
 from builtins import ValueError, dict, str
-from settings.config import settings
-from app.utils.smtp_connection import SMTPClient
+from settings.config import get_settings
+from typing import Optional
+from app.utils.smtp_connection import AsyncSMTPClient
 from app.utils.template_manager import TemplateManager
 from app.models.user_model import User
 
+# One pool of SMTP connections per process, shared by every EmailService instance.
+settings = get_settings()
+shared_smtp_client = AsyncSMTPClient(
+    server=settings.smtp_server,
+    port=settings.smtp_port,
+    username=settings.smtp_username,
+    password=settings.smtp_password,
+    pool_size=settings.smtp_pool_size,
+    idle_timeout=settings.smtp_idle_timeout,
+    health_check_after=settings.smtp_health_check_after,
+    max_messages=settings.smtp_max_messages_per_connection,
+    start_tls=settings.smtp_start_tls,
+    timeout=settings.smtp_timeout,
+)
+
 class EmailService:
-    def __init__(self, template_manager: TemplateManager):
-        self.smtp_client = SMTPClient(
-            server=settings.smtp_server,
-            port=settings.smtp_port,
-            username=settings.smtp_username,
-            password=settings.smtp_password
-        )
+    def __init__(self, template_manager: TemplateManager, smtp_client: Optional[AsyncSMTPClient] = None):
+        self.smtp_client = smtp_client or shared_smtp_client
         self.template_manager = template_manager
 
     async def send_user_email(self, user_data: dict, email_type: str):
@@ -25,13 +36,18 @@ class EmailService:
         if email_type not in subject_map:
             raise ValueError("Invalid email type")
 
-        html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        compiled = self.template_manager.get_compiled(email_type)
+        html_content = compiled.render_html(**user_data)
+        text_content = compiled.render_text(**user_data)
+        await self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'], text_content=text_content)
 
-    async def send_verification_email(self, user: User):
-        verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+    def verification_email_data(self, user: User) -> dict:
+        verification_url = f"{get_settings().server_base_url}verify-email/{user.id}/{user.verification_token}"
+        return {
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self.verification_email_data(user), 'email_verification')
@@ -1,10 +1,76 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import dict, float, int, isinstance, len, str
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
 import jwt
 from datetime import datetime, timedelta
-from settings.config import settings
+from settings.config import get_settings
+
+class TokenCache:
+    """
+    Bounded LRU of verified token claims, so a token seen again skips parsing and the signature check.
+
+    Entries are keyed by a digest of the signing key and the token, which keeps raw tokens out of
+    memory and misses every entry once the key changes. Each entry expires at the token's `exp`.
+    get_current_user runs in the threadpool, hence the lock.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str, secret: str) -> bytes:
+        return hashlib.sha256(f"{secret}\0{token}".encode()).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: bytes, claims: dict, maxsize: int):
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return  # never cache a token that does not expire
+        with self._lock:
+            self._entries[key] = (claims, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+token_cache = TokenCache()
 
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
+    settings = get_settings()
     to_encode = data.copy()
     # Convert role to uppercase before encoding the JWT
     if 'role' in to_encode:
@@ -14,9 +80,33 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
+def create_refresh_token(*, user_id: UUID, token_id: UUID, family_id: UUID, expires_at: datetime) -> str:
+    """Sign a refresh token; it carries no role, so get_current_user never accepts it."""
+    settings = get_settings()
+    to_encode = {"sub": str(user_id), "jti": str(token_id), "fam": str(family_id), "type": "refresh", "exp": expires_at}
+    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """Verify a refresh token's signature, expiry and type. Never cached: each one is used once."""
+    settings = get_settings()
+    try:
+        decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm], options={"require": ["exp", "jti"]})
+    except jwt.PyJWTError:
+        return None
+    return decoded if decoded.get("type") == "refresh" else None
+
 def decode_token(token: str):
+    settings = get_settings()
+    key = None
+    if settings.token_cache_size > 0:
+        key = TokenCache.key(token, f"{settings.jwt_algorithm}:{settings.jwt_secret_key}")
+        claims = token_cache.get(key)
+        if claims is not None:
+            return claims
     try:
         decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return decoded
     except jwt.PyJWTError:
         return None
+    if key is not None:
+        token_cache.set(key, decoded, settings.token_cache_size)
+    return decoded
@@ -0,0 +1,115 @@
+from builtins import Exception, classmethod, dict, int, len, list, min, str, zip
+import asyncio
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_service import EmailService
+from settings.config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OutboxService:
+    @classmethod
+    def enqueue(cls, session: AsyncSession, email_type: str, user_data: dict, user_id: Optional[UUID] = None) -> EmailOutbox:
+        """
+        Queue an email in the caller's transaction; it is only sent if that transaction commits.
+
+        :param email_type: Template name understood by EmailService.send_user_email.
+        :param user_data: Template variables, including the recipient under "email".
+        """
+        message = EmailOutbox(email_type=email_type, recipient=user_data['email'], context=user_data, user_id=user_id)
+        session.add(message)
+        return message
+
+    @classmethod
+    async def claim_batch(cls, session: AsyncSession, batch_size: int) -> List[Row]:
+        """
+        Claim up to `batch_size` due messages and commit the claim.
+
+        Returns plain rows of (id, email_type, context, attempts), with `attempts` already
+        counting this claim.
+
+        Rows are picked with FOR UPDATE SKIP LOCKED so concurrent dispatchers never claim the
+        same message, and their `available_at` is pushed forward by the lease so a dispatcher
+        that dies mid-send leaves them to be retried once the lease runs out.
+        """
+        settings = get_settings()
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.available_at <= func.now())
+            .order_by(EmailOutbox.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                available_at=func.now() + timedelta(seconds=settings.outbox_lease_seconds),
+                attempts=EmailOutbox.attempts + 1,
+            )
+            .returning(EmailOutbox.id, EmailOutbox.email_type, EmailOutbox.context, EmailOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(claim)
+        messages = list(result.all())
+        await session.commit()
+        return messages
+
+    @classmethod
+    async def _send(cls, email_service: EmailService, message: Row, slots: asyncio.Semaphore) -> Optional[str]:
+        async with slots:
+            try:
+                await email_service.send_user_email(message.context, message.email_type)
+                return None
+            except Exception as e:
+                logger.error(f"Failed to send {message.email_type} email {message.id}: {e}")
+                return str(e) or e.__class__.__name__
+
+    @classmethod
+    async def dispatch_batch(cls, session: AsyncSession, email_service: EmailService, batch_size: Optional[int] = None) -> int:
+        """
+        Claim one batch, render and send it concurrently, and record each outcome.
+
+        Failed messages are retried with exponential backoff until `outbox_max_attempts`
+        is reached, after which they are marked FAILED.
+
+        :return: The number of messages claimed.
+        """
+        settings = get_settings()
+        messages = await cls.claim_batch(session, batch_size or settings.outbox_batch_size)
+        if not messages:
+            return 0
+
+        slots = asyncio.Semaphore(settings.outbox_send_concurrency)
+        errors = await asyncio.gather(*(cls._send(email_service, message, slots) for message in messages))
+
+        sent_ids = [message.id for message, error in zip(messages, errors) if error is None]
+        if sent_ids:
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent_ids))
+                .values(status=OutboxStatus.SENT, sent_at=func.now(), last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        for message, error in zip(messages, errors):
+            if error is None:
+                continue
+            retry_in = timedelta(seconds=min(settings.outbox_retry_backoff * 2 ** (message.attempts - 1), 3600))
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == message.id)
+                .values(
+                    status=OutboxStatus.FAILED if message.attempts >= settings.outbox_max_attempts else OutboxStatus.PENDING,
+                    available_at=func.now() + retry_in,
+                    last_error=error[:1000],
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+        logger.info(f"Dispatched {len(sent_ids)} of {len(messages)} queued emails")
+        return len(messages)
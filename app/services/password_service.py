@@ -0,0 +1,180 @@
+# app/services/password_service.py
+from builtins import Exception, ValueError, bool, float, int, isinstance, len, max, str, sum
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum
+from settings.config import get_settings
+from app.database import effective_workers
+from app.utils.security import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+class HashLane(Enum):
+    """Priority lanes for hashing work; waiting logins are always served before registrations."""
+    LOGIN = "login"
+    REGISTRATION = "registration"
+
+# A pool smaller than this could not keep a worker free for logins while a registration hashes.
+MIN_HASH_WORKERS = 2
+
+class PasswordHashingBusy(Exception):
+    """Raised when a hashing call cannot be queued or does not finish within its timeout."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded process pool so the event loop keeps
+    serving other requests while CPU-bound work runs in parallel.
+
+    Admission is controlled in the event loop before anything is submitted to the pool:
+    at most `workers` calls run at once, at most `queue_size` calls wait for a slot, and
+    registration hashing may only occupy `registration_share` of the pool so a signup burst
+    cannot starve logins. The pool has at least MIN_HASH_WORKERS processes and, unless the
+    share is 1, registration always leaves one of them to the LOGIN lane.
+    """
+
+    def __init__(self, workers: int = 0, queue_size: int = 64, timeout: float = 5.0, registration_share: float = 0.5):
+        self.workers = max(MIN_HASH_WORKERS, workers or os.cpu_count() or 1)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        if registration_share >= 1:
+            self.registration_slots = self.workers
+        else:
+            self.registration_slots = max(1, min(self.workers - 1, int(self.workers * registration_share)))
+        self._executor = None
+        self._available = self.workers
+        self._registration_running = 0
+        self._waiters = {HashLane.LOGIN: deque(), HashLane.REGISTRATION: deque()}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _can_run(self, lane: HashLane) -> bool:
+        if self._available <= 0:
+            return False
+        return lane is HashLane.LOGIN or self._registration_running < self.registration_slots
+
+    def _grant(self, lane: HashLane):
+        self._available -= 1
+        if lane is HashLane.REGISTRATION:
+            self._registration_running += 1
+
+    def _release(self, lane: HashLane):
+        self._available += 1
+        if lane is HashLane.REGISTRATION:
+            self._registration_running -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        for lane in (HashLane.LOGIN, HashLane.REGISTRATION):
+            waiters = self._waiters[lane]
+            while waiters and self._can_run(lane):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._grant(lane)
+                    waiter.set_result(None)
+
+    def queued(self) -> int:
+        """Number of calls currently waiting for a free worker."""
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def _acquire(self, lane: HashLane):
+        if lane is HashLane.LOGIN:
+            queued_ahead = len(self._waiters[HashLane.LOGIN])
+        else:
+            queued_ahead = self.queued()
+        if not queued_ahead and self._can_run(lane):
+            self._grant(lane)
+            return
+        if self.queued() >= self.queue_size:
+            raise PasswordHashingBusy("Password hashing queue is full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as we gave up; hand it on.
+                self._release(lane)
+            else:
+                try:
+                    self._waiters[lane].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _on_done(self, lane: HashLane, future: asyncio.Future):
+        self._release(lane)
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            logger.error("Password hashing pool broke; it will be recreated on next use")
+            self._executor = None
+
+    async def _run(self, lane: HashLane, func, *args):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            await asyncio.wait_for(self._acquire(lane), self.timeout)
+        except asyncio.TimeoutError as e:
+            raise PasswordHashingBusy("Timed out waiting for a password hashing worker") from e
+        try:
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self._release(lane)
+            raise
+        # The slot is only freed when the worker really finishes, even if the caller times out.
+        future.add_done_callback(lambda f: self._on_done(lane, f))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError as e:
+            raise PasswordHashingBusy("Password hashing timed out") from e
+
+    async def hash(self, password: str, lane: HashLane = HashLane.REGISTRATION) -> str:
+        """Hash a password in the pool. Raises ValueError if bcrypt fails."""
+        return await self._run(lane, hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str, lane: HashLane = HashLane.LOGIN) -> bool:
+        """Verify a password in the pool. Raises ValueError for malformed hashes."""
+        return await self._run(lane, verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        """Stop the worker processes; a later call will start a fresh pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def hash_workers(settings) -> int:
+    """
+    bcrypt processes for this server worker's pool.
+
+    With password_hash_workers left at 0, the host's cores are divided across the server
+    workers, as pool_options divides db_max_connections, so every worker having its own pool
+    does not oversubscribe the CPU. Never below MIN_HASH_WORKERS, which keeps the LOGIN lane
+    open even when there are more server workers than cores.
+    """
+    if settings.password_hash_workers > 0:
+        return max(MIN_HASH_WORKERS, settings.password_hash_workers)
+    return max(MIN_HASH_WORKERS, (os.cpu_count() or 1) // effective_workers(settings))
+
+settings = get_settings()
+password_hasher = PasswordHasher(
+    workers=hash_workers(settings),
+    queue_size=settings.password_hash_queue_size,
+    timeout=settings.password_hash_timeout,
+    registration_share=settings.password_hash_registration_share,
+)
+# Admin bulk imports hash through their own pool, started on first use, so a large import
+# neither waits on the registration lane nor delays logins and signups.
+bulk_password_hasher = PasswordHasher(
+    workers=settings.bulk_import_hash_workers or hash_workers(settings),
+    queue_size=settings.password_hash_queue_size,
+    timeout=settings.password_hash_timeout,
+    registration_share=1,
+)
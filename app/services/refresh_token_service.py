@@ -0,0 +1,114 @@
+from builtins import classmethod, str
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.refresh_token_model import RefreshToken
+from app.models.user_model import User
+from app.services.jwt_service import create_refresh_token, decode_refresh_token
+from settings.config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RefreshTokenService:
+    @classmethod
+    def issue(cls, session: AsyncSession, user_id: UUID, family_id: Optional[UUID] = None) -> str:
+        """
+        Record a new refresh token in the caller's transaction and return it signed.
+
+        :param family_id: The family being rotated; a new family is started when omitted.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=get_settings().refresh_token_expire_minutes)
+        record = RefreshToken(id=uuid4(), user_id=user_id, family_id=family_id or uuid4(), expires_at=expires_at)
+        session.add(record)
+        return create_refresh_token(user_id=user_id, token_id=record.id, family_id=record.family_id, expires_at=expires_at)
+
+    @classmethod
+    async def rotate(cls, session: AsyncSession, token: str) -> Optional[Tuple[Row, str]]:
+        """
+        Exchange a refresh token for its successor without touching the password hash.
+
+        The presented token is revoked and its user read back by a single UPDATE ... FROM users
+        RETURNING, so two concurrent refreshes with the same token cannot both succeed. A token
+        that was already revoked is treated as stolen and its whole family is revoked.
+
+        :return: The user's (id, email, role) and the new refresh token, or None if the token
+            is invalid, expired, revoked, or belongs to a locked account.
+        """
+        claims = decode_refresh_token(token)
+        if claims is None:
+            return None
+        try:
+            token_id = UUID(claims["jti"])
+        except ValueError:
+            return None
+
+        # Core tables rather than ORM entities: the ORM cannot RETURNING columns of the FROM table.
+        tokens, users = RefreshToken.__table__, User.__table__
+        claim = (
+            update(tokens)
+            .where(
+                tokens.c.id == token_id,
+                tokens.c.revoked_at.is_(None),
+                tokens.c.expires_at > func.now(),
+                tokens.c.user_id == users.c.id,
+                users.c.is_locked.is_(False),
+            )
+            .values(revoked_at=func.now())
+            .returning(users.c.id, users.c.email, users.c.role, tokens.c.family_id)
+        )
+        user = (await session.execute(claim)).first()
+        if user is None:
+            await cls._detect_reuse(session, token_id)
+            return None
+
+        new_token = cls.issue(session, user.id, user.family_id)
+        await session.commit()
+        return user, new_token
+
+    @classmethod
+    async def _detect_reuse(cls, session: AsyncSession, token_id: UUID):
+        result = await session.execute(
+            select(RefreshToken.family_id, RefreshToken.user_id).where(RefreshToken.id == token_id, RefreshToken.revoked_at.is_not(None))
+        )
+        reused = result.first()
+        if reused is None:
+            await session.rollback()
+            return
+        logger.warning(f"Revoked refresh token reused for user {reused.user_id}; revoking its token family")
+        await cls.revoke_family(session, reused.family_id)
+
+    @classmethod
+    async def revoke_family(cls, session: AsyncSession, family_id: UUID):
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    @classmethod
+    async def revoke(cls, session: AsyncSession, token: str) -> bool:
+        """Revoke the family of a presented refresh token, ending that login session."""
+        claims = decode_refresh_token(token)
+        if claims is None or "fam" not in claims:
+            return False
+        try:
+            family_id = UUID(claims["fam"])
+        except ValueError:
+            return False
+        await cls.revoke_family(session, family_id)
+        return True
+
+    @classmethod
+    async def revoke_for_user(cls, session: AsyncSession, user_id: UUID):
+        """Revoke every live refresh token of a user, in the caller's transaction."""
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
@@ -1,31 +1,211 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import AttributeError, Exception, RuntimeError, ValueError, bool, classmethod, dict, getattr, int, isinstance, iter, len, list, max, next, object, range, set, str, sum, zip
 from datetime import datetime, timezone
+from enum import Enum
+import asyncio
+import html
 import secrets
-from typing import Optional, Dict, List
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Dict, List, Sequence, Set, Tuple, Union
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Row, event, func, null, update, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from app.database import write_transaction
 from app.dependencies import get_email_service, get_settings
-from app.models.user_model import User
-from app.schemas.user_schemas import UserCreate, UserUpdate
-from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
-from uuid import UUID
+from app.models.user_model import SEARCH_CONFIG, User
+from app.schemas.pagination_schema import CountStrategy
+from app.schemas.user_schemas import UserCreate, UserSort, UserUpdate
+from app.utils.cursor import Cursor, RankCursor
+from app.utils.etag import etag_matches, user_etag
+from app.utils.nickname_gen import generate_nicknames
+from app.utils.security import generate_verification_token
+from app.services.password_service import HashLane, PasswordHashingBusy, bulk_password_hasher, password_hasher
+from uuid import UUID, uuid4
 from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxService
+from app.services.refresh_token_service import RefreshTokenService
 from app.models.user_model import UserRole
 import logging
 
-settings = get_settings()
 logger = logging.getLogger(__name__)
 
+NICKNAME_ATTEMPTS = 5
+
+# Columns written by the export; credentials and verification tokens never leave the database.
+EXPORT_COLUMNS = (
+    User.id, User.nickname, User.email, User.first_name, User.last_name, User.bio,
+    User.profile_picture_url, User.linkedin_profile_url, User.github_profile_url, User.role,
+    User.is_professional, User.email_verified, User.is_locked, User.last_login_at,
+    User.created_at, User.updated_at,
+)
+
+# Columns behind each UserSort key, all leading an index; non-unique keys are tie-broken by id
+# so pages stay stable.
+SORT_KEYS = {
+    "created_at": (User.created_at, User.id),
+    "last_login_at": (User.last_login_at, User.id),
+    "email": (User.email,),
+    "nickname": (User.nickname,),
+}
+
+# ts_headline wraps matches in control characters that do not occur in profile text, so the
+# fragment can be HTML-escaped before they are swapped for <mark> tags.
+HEADLINE_OPTIONS = "StartSel=\x02, StopSel=\x03, MaxFragments=2, MaxWords=20, MinWords=5"
+
+def _mark(headline: str) -> str:
+    return html.escape(headline).replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+class PreconditionFailed(Exception):
+    """Raised when a conditional update's If-Match does not match the stored user."""
+
+class LoginOutcome(Enum):
+    SUCCESS = "success"
+    LOCKED = "locked"
+    FAILED = "failed"
+
+class _CachedCount:
+    """Process-local user total, kept in step by create/delete and recounted once it expires."""
+
+    def __init__(self):
+        self.value: Optional[int] = None
+        self.expires_at = 0.0
+
+    def get(self) -> Optional[int]:
+        if self.value is not None and time.monotonic() < self.expires_at:
+            return self.value
+        return None
+
+    def set(self, value: int, ttl: float):
+        self.value = value
+        self.expires_at = time.monotonic() + ttl
+
+    def adjust(self, delta: int):
+        if self.value is not None:
+            self.value = max(0, self.value + delta)
+
+    def clear(self):
+        self.value = None
+
+user_count_cache = _CachedCount()
+
+class CachedUser:
+    """A read-only snapshot of one user's EXPORT_COLUMNS, detached from any session."""
+    __slots__ = tuple(column.key for column in EXPORT_COLUMNS)
+
+    def __init__(self, row: Row):
+        for name, value in zip(self.__slots__, row):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CachedUser is read-only")
+
+class UserCache:
+    """
+    Bounded LRU of user snapshots, reachable by id, email or nickname.
+
+    Entries expire after the configured TTL and are dropped as soon as this process changes the
+    user, so the TTL only bounds staleness from writes made by other workers. A lookup that was
+    already in flight when an invalidation happened is not stored, so it cannot put back what
+    the write just removed.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[UUID, Tuple[CachedUser, float]]" = OrderedDict()
+        self._by_email: Dict[str, UUID] = {}
+        self._by_nickname: Dict[str, UUID] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve(self, field: str, value) -> Optional[UUID]:
+        if field == "id":
+            return value
+        return (self._by_email if field == "email" else self._by_nickname).get(value)
+
+    def get(self, field: str, value) -> Optional[CachedUser]:
+        user_id = self._resolve(field, value)
+        entry = self._entries.get(user_id) if user_id is not None else None
+        if entry is not None:
+            user, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return user
+            self._discard(user_id)
+        self.misses += 1
+        return None
+
+    def set(self, user: CachedUser, generation: int, ttl: float, maxsize: int):
+        """Store `user` unless something was invalidated since `generation` was read."""
+        if generation != self.generation or maxsize <= 0:
+            return
+        self._discard(user.id)
+        self._entries[user.id] = (user, time.monotonic() + ttl)
+        self._by_email[user.email] = user.id
+        if user.nickname:
+            self._by_nickname[user.nickname] = user.id
+        while len(self._entries) > maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, user_id: UUID):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        user = entry[0]
+        if self._by_email.get(user.email) == user_id:
+            del self._by_email[user.email]
+        if user.nickname and self._by_nickname.get(user.nickname) == user_id:
+            del self._by_nickname[user.nickname]
+
+    def invalidate(self, user_id: UUID):
+        self.generation += 1
+        self._discard(user_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_email.clear()
+        self._by_nickname.clear()
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+user_cache = UserCache()
+
+def invalidate_on_commit(session: AsyncSession, user_id: UUID):
+    """
+    Drop the user from user_cache once the session's transaction commits, for writes whose
+    caller commits. Invalidating earlier would let a concurrent lookup cache the pre-commit row.
+    """
+    session.info.setdefault("invalidate_users", set()).add(user_id)
+
+def _invalidate_committed(session):
+    for user_id in session.info.pop("invalidate_users", ()):
+        user_cache.invalidate(user_id)
+
+def _forget_invalidations(session):
+    session.info.pop("invalidate_users", None)
+
+event.listen(Session, "after_commit", _invalidate_committed)
+event.listen(Session, "after_rollback", _forget_invalidations)
+
 class UserService:
     @classmethod
     async def _execute_query(cls, session: AsyncSession, query):
+        """Run a query in the session's current transaction; writers commit once through write_transaction."""
         try:
-            result = await session.execute(query)
-            await session.commit()
-            return result
+            return await session.execute(query)
         except SQLAlchemyError as e:
             logger.error(f"Database error: {e}")
             await session.rollback()
@@ -41,6 +221,12 @@ class UserService:
     async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
         return await cls._fetch_user(session, id=user_id)
 
+    @classmethod
+    async def get_version(cls, session: AsyncSession, user_id: UUID) -> Optional[Row]:
+        """Fetch only (id, updated_at), enough to compute the user's ETag."""
+        result = await cls._execute_query(session, select(User.id, User.updated_at).where(User.id == user_id))
+        return result.first() if result else None
+
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
         return await cls._fetch_user(session, nickname=nickname)
@@ -49,6 +235,41 @@ class UserService:
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
         return await cls._fetch_user(session, email=email)
 
+    @classmethod
+    def peek_cached(cls, field: str, value) -> Optional[CachedUser]:
+        """The cached copy of a user, if this worker has one, without touching the database."""
+        return user_cache.get(field, value)
+
+    @classmethod
+    async def get_cached(cls, session: AsyncSession, field: str, value, refresh: bool = False) -> Optional[CachedUser]:
+        """
+        Look a user up by "id", "email" or "nickname", through this worker's user cache.
+
+        Returns a read-only CachedUser, not an ORM instance; code that changes the user loads it
+        with get_by_id and friends, and the write methods below invalidate the cached copy.
+
+        Only rows read from the primary are cached: a replica may still hold the row as it was
+        before a write, and caching that would outlive the invalidation. Pass `refresh` to skip
+        the cached copy, for clients that must read their own writes, or when the cache was
+        already consulted with `peek_cached`.
+        """
+        if field not in ("id", "email", "nickname"):
+            raise ValueError(f"Users are not cached by {field}")
+        if not refresh:
+            user = user_cache.get(field, value)
+            if user is not None:
+                return user
+        generation = user_cache.generation
+        result = await cls._execute_query(session, select(*EXPORT_COLUMNS).where(getattr(User, field) == value))
+        row = result.first() if result else None
+        if row is None:
+            return None
+        user = CachedUser(row)
+        if not session.info.get("replica"):
+            settings = get_settings()
+            user_cache.set(user, generation, settings.user_cache_ttl, settings.user_cache_size)
+        return user
+
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
         try:
@@ -57,16 +278,23 @@ class UserService:
             if existing_user:
                 logger.error("User with given email already exists.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            new_user = User(**validated_data)
+            validated_data['hashed_password'] = await password_hasher.hash(validated_data.pop('password'), HashLane.REGISTRATION)
+            new_user = User(id=uuid4(), **validated_data)
             new_user.verification_token = generate_verification_token()
-            new_nickname = generate_nickname()
-            while await cls.get_by_nickname(session, new_nickname):
-                new_nickname = generate_nickname()
-            new_user.nickname = new_nickname
-            session.add(new_user)
-            await session.commit()
-            await email_service.send_verification_email(new_user)
+            for attempt in range(NICKNAME_ATTEMPTS):
+                new_user.nickname = await cls.allocate_nickname(session)
+                try:
+                    async with write_transaction(session):
+                        session.add(new_user)
+                        # Queued in the same transaction; the dispatcher (app.dispatcher) sends it.
+                        OutboxService.enqueue(session, 'email_verification', email_service.verification_email_data(new_user), new_user.id)
+                    break
+                except IntegrityError as e:
+                    # Another registration took the nickname between our check and the insert.
+                    if "nickname" not in str(e.orig) or attempt == NICKNAME_ATTEMPTS - 1:
+                        raise
+                    logger.info(f"Nickname {new_user.nickname} was taken concurrently; allocating another")
+            user_count_cache.adjust(1)
             
             return new_user
         except ValidationError as e:
@@ -74,23 +302,172 @@ class UserService:
             return None
 
     @classmethod
-    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+    async def allocate_nickname(cls, session: AsyncSession) -> str:
+        """
+        Pick an unused nickname, checking a batch of random candidates with one IN query.
+
+        With the default word lists and digits the space holds about 41 million names, so a
+        batch almost always has a free candidate and allocation costs one query regardless of
+        how many users exist. The unique index still has the final say; see `create`.
+        """
+        return (await cls.allocate_nicknames(session, 1))[0]
+
+    @classmethod
+    async def allocate_nicknames(cls, session: AsyncSession, count: int, exclude: Set[str] = frozenset()) -> List[str]:
+        """Pick `count` distinct unused nicknames, none of them in `exclude`."""
+        settings = get_settings()
+        free: List[str] = []
+        if count <= 0:
+            return free
+        for _ in range(NICKNAME_ATTEMPTS):
+            wanted = count - len(free)
+            candidates = [
+                candidate for candidate in generate_nicknames(wanted + settings.nickname_batch_size - 1, settings.nickname_number_digits)
+                if candidate not in exclude and candidate not in free
+            ]
+            result = await session.execute(select(User.nickname).where(User.nickname.in_(candidates)))
+            taken = set(result.scalars())
+            free.extend([candidate for candidate in candidates if candidate not in taken][:wanted])
+            if len(free) == count:
+                return free
+        raise RuntimeError("No free nickname found; increase nickname_number_digits")
+
+    @classmethod
+    async def bulk_create(cls, session: AsyncSession, rows: List[Tuple[int, Union[dict, ValueError]]], email_service: EmailService) -> List[dict]:
+        """
+        Create a chunk of users in one transaction.
+
+        Rows are validated with UserCreate. Emails are checked against the table with one query,
+        and every user gets an allocated nickname, as in `create`, whatever the row supplied. Passwords are hashed in parallel on every process of the bulk import
+        hashing pool, which is separate from the one logins and registrations use. Users go in
+        with a single multi-row INSERT ... ON CONFLICT DO NOTHING, and their verification
+        emails are queued in the same transaction.
+
+        :param rows: (row number, data) pairs; a ValueError in place of the data reports a row
+            the caller could not parse.
+        :return: One result per row, in input order, with status "created" and the new id or
+            status "failed" and the reasons.
+        """
+        results: Dict[int, dict] = {}
+        valid: List[Tuple[int, dict]] = []
+        emails: Set[str] = set()
+
+        def fail(row: int, email: Optional[str], *errors: str):
+            results[row] = {"row": row, "email": email, "status": "failed", "errors": list(errors)}
+
+        for row, data in rows:
+            if isinstance(data, ValueError):
+                fail(row, None, str(data))
+                continue
+            try:
+                validated = UserCreate(**data).model_dump()
+            except ValidationError as e:
+                fail(row, data.get("email"), *(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()))
+                continue
+            if validated["email"] in emails:
+                fail(row, validated["email"], "email: appears earlier in this import")
+            else:
+                emails.add(validated["email"])
+                valid.append((row, validated))
+
+        if valid:
+            result = await session.execute(select(User.email).where(User.email.in_(emails)))
+            taken_emails = set(result.scalars())
+            accepted = []
+            for row, validated in valid:
+                if validated["email"] in taken_emails:
+                    fail(row, validated["email"], "email: already registered")
+                else:
+                    accepted.append((row, validated))
+            valid = accepted
+
+        generated = iter(await cls.allocate_nicknames(session, len(valid)))
+        slots = asyncio.Semaphore(bulk_password_hasher.registration_slots)
+
+        async def hash_password(password: str) -> str:
+            async with slots:
+                return await bulk_password_hasher.hash(password, HashLane.REGISTRATION)
+
+        hashes = await asyncio.gather(*(hash_password(validated.pop("password")) for _, validated in valid), return_exceptions=True)
+
+        records: Dict[UUID, Tuple[int, dict]] = {}
+        for (row, validated), hashed in zip(valid, hashes):
+            if isinstance(hashed, Exception):
+                fail(row, validated["email"], "password: could not be hashed, retry this row")
+                continue
+            record = dict(
+                validated,
+                id=uuid4(),
+                nickname=next(generated),
+                hashed_password=hashed,
+                verification_token=generate_verification_token(),
+                role=UserRole.ANONYMOUS,
+                email_verified=False,
+                is_professional=False,
+                is_locked=False,
+                failed_login_attempts=0,
+            )
+            records[record["id"]] = (row, record)
+
+        if records:
+            async with write_transaction(session):
+                result = await session.execute(
+                    pg_insert(User.__table__)
+                    .values([record for _, record in records.values()])
+                    .on_conflict_do_nothing()
+                    .returning(User.__table__.c.id)
+                )
+                inserted = set(result.scalars())
+                for user_id, (row, record) in records.items():
+                    if user_id not in inserted:
+                        fail(row, record["email"], "email or nickname was registered concurrently")
+                        continue
+                    user = User(id=user_id, email=record["email"], first_name=record["first_name"], verification_token=record["verification_token"])
+                    OutboxService.enqueue(session, 'email_verification', email_service.verification_email_data(user), user_id)
+                    results[row] = {"row": row, "email": record["email"], "status": "created", "id": str(user_id)}
+            user_count_cache.adjust(len(inserted))
+
+        return [results[row] for row, _ in rows]
+
+    @classmethod
+    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str], if_match: Optional[str] = None) -> Optional[User]:
+        """
+        Update a user and return it as stored.
+
+        :param if_match: An If-Match header value. The row is locked and its ETag compared before
+            writing, and PreconditionFailed is raised if it no longer matches.
+        """
         try:
             # validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
+                validated_data['hashed_password'] = await password_hasher.hash(validated_data.pop('password'), HashLane.REGISTRATION)
+            # Stamped here rather than by onupdate so the returned user carries the new ETag.
+            validated_data['updated_at'] = datetime.now(timezone.utc)
+            query = (
+                update(User).where(User.id == user_id).values(**validated_data).returning(User)
+                .execution_options(synchronize_session="fetch", populate_existing=True)
+            )
+            async with write_transaction(session):
+                if if_match is not None:
+                    result = await session.execute(select(User.id, User.updated_at).where(User.id == user_id).with_for_update())
+                    current = result.first()
+                    if current is None:
+                        return None
+                    if not etag_matches(if_match, user_etag(current.id, current.updated_at), weak=False):
+                        raise PreconditionFailed(f"User {user_id} was modified")
+                result = await session.execute(query)
+                updated_user = result.scalars().first()
+            user_cache.invalidate(user_id)
             if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
                 logger.info(f"User {user_id} updated successfully.")
                 return updated_user
             else:
                 logger.error(f"User {user_id} not found after update attempt.")
             return None
+        except (PasswordHashingBusy, PreconditionFailed):
+            raise
         except Exception as e:  # Broad exception handling for debugging
             logger.error(f"Error during user update: {e}")
             return None
@@ -101,42 +478,242 @@ class UserService:
         if not user:
             logger.info(f"User with ID {user_id} not found.")
             return False
-        await session.delete(user)
-        await session.commit()
+        async with write_transaction(session):
+            await session.delete(user)
+        user_cache.invalidate(user_id)
+        user_count_cache.adjust(-1)
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
+    def _load_only(cls, query, columns: Optional[Sequence[str]], *required: str):
+        """
+        Restrict the User entity of `query` to the named attributes (plus the primary key and
+        `required`), so Postgres reads and the ORM hydrates nothing else. None loads every column.
+        Attributes left out are not loaded, and touching them on an async session raises.
+        """
+        if columns is None:
+            return query
+        return query.options(load_only(*(getattr(User, name) for name in dict.fromkeys(("id", *columns, *required)))))
+
+    @classmethod
+    def _ordering(cls, sort: UserSort) -> list:
+        descending = sort.value.startswith("-")
+        return [column.desc() if descending else column for column in SORT_KEYS[sort.value.lstrip("-")]]
+
+    @classmethod
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, columns: Optional[Sequence[str]] = None,
+                         sort: UserSort = UserSort.CREATED_AT, **filters) -> List[User]:
+        """
+        Fetch a page of users by offset.
+
+        :param columns: User attributes to load; see `_load_only`.
+        :param sort: One of the whitelisted SORT_KEYS orderings.
+        :param filters: Keyword filters accepted by `filter_conditions`.
+        """
+        query = (
+            cls._load_only(select(User), columns)
+            .where(*cls.filter_conditions(**filters))
+            .order_by(*cls._ordering(sort))
+            .offset(skip).limit(limit)
+        )
         result = await cls._execute_query(session, query)
         return result.scalars().all() if result else []
 
+    @classmethod
+    async def list_users_with_total(cls, session: AsyncSession, skip: int = 0, limit: int = 10, columns: Optional[Sequence[str]] = None,
+                                    sort: UserSort = UserSort.CREATED_AT, **filters) -> Tuple[List[User], Optional[int]]:
+        """
+        Fetch a page of users as `list_users` does, plus the total of matching users, in one round
+        trip using count(*) OVER ().
+
+        :return: The users, and the total; the total is None when the page is empty because
+                 no row was returned to carry it.
+        """
+        total = func.count().over().label("total")
+        query = (
+            cls._load_only(select(User, total), columns)
+            .where(*cls.filter_conditions(**filters))
+            .order_by(*cls._ordering(sort))
+            .offset(skip).limit(limit)
+        )
+        result = await cls._execute_query(session, query)
+        rows = result.all() if result else []
+        if not rows:
+            return [], None
+        return [row[0] for row in rows], rows[0][1]
+
+    @classmethod
+    async def list_users_by_cursor(cls, session: AsyncSession, limit: int = 10, cursor: Optional[Cursor] = None, columns: Optional[Sequence[str]] = None,
+                                   **filters) -> Tuple[List[User], bool]:
+        """
+        Fetch a page of users by seeking on the (created_at, id) index instead of using OFFSET.
+
+        :param session: The AsyncSession instance for database access.
+        :param limit: Maximum number of users to return.
+        :param cursor: Position to read from; None starts at the beginning.
+        :param columns: User attributes to load, as for `list_users`; created_at is always
+                        loaded too, since the page cursors are built from it.
+        :param filters: Keyword filters accepted by `filter_conditions`.
+        :return: The users in ascending (created_at, id) order, and whether more rows exist
+                 beyond the page in the direction it was read.
+        """
+        key = tuple_(User.created_at, User.id)
+        query = cls._load_only(select(User), columns, "created_at").where(*cls.filter_conditions(**filters))
+        if cursor is not None and cursor.backwards:
+            query = query.where(key < tuple_(cursor.created_at, cursor.id)).order_by(User.created_at.desc(), User.id.desc())
+        else:
+            if cursor is not None:
+                query = query.where(key > tuple_(cursor.created_at, cursor.id))
+            query = query.order_by(User.created_at, User.id)
+        result = await cls._execute_query(session, query.limit(limit + 1))
+        users = list(result.scalars().all()) if result else []
+        has_more = len(users) > limit
+        users = users[:limit]
+        if cursor is not None and cursor.backwards:
+            users.reverse()
+        return users, has_more
+
+    @classmethod
+    async def search(cls, session: AsyncSession, text_query: str, limit: int = 10, cursor: Optional[RankCursor] = None) -> Tuple[List[Row], bool]:
+        """
+        Full-text search over names and bio, best matches first.
+
+        Matches are found through the GIN index on the generated `search_vector` and ordered by
+        (rank DESC, id DESC); a cursor seeks past its position in that order instead of using
+        OFFSET. Only the page's rows are joined back to users and highlighted, so ts_headline,
+        which re-parses the text, runs `limit` times however many users match.
+
+        :param text_query: Search text in websearch syntax: words, "quoted phrases", or, -word.
+        :param cursor: Position to read from; None starts at the best match.
+        :return: Rows of (User, rank, highlight) with `<mark>`-wrapped, HTML-escaped highlights,
+                 and whether more matches exist beyond the page.
+        """
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, text_query)
+        rank = func.ts_rank_cd(User.search_vector, query).label("rank")
+        matches = select(User.id, rank).where(User.search_vector.bool_op("@@")(query))
+        if cursor is not None:
+            matches = matches.where(tuple_(rank, User.id) < tuple_(cursor.rank, cursor.id))
+        matches = matches.order_by(rank.desc(), User.id.desc()).limit(limit + 1).subquery()
+        document = func.concat_ws(" ", User.nickname, User.first_name, User.last_name, User.bio)
+        highlight = func.ts_headline(SEARCH_CONFIG, document, query, HEADLINE_OPTIONS)
+        result = await cls._execute_query(
+            session,
+            select(User, matches.c.rank, highlight)
+            .join(matches, matches.c.id == User.id)
+            .order_by(matches.c.rank.desc(), User.id.desc()),
+        )
+        rows = list(result.all()) if result else []
+        has_more = len(rows) > limit
+        return [(user, rank, _mark(highlight)) for user, rank, highlight in rows[:limit]], has_more
+
+    @classmethod
+    def filter_conditions(cls, role: Optional[UserRole] = None, is_locked: Optional[bool] = None,
+                          email_verified: Optional[bool] = None, is_professional: Optional[bool] = None,
+                          created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                          last_login_after: Optional[datetime] = None, last_login_before: Optional[datetime] = None) -> list:
+        """
+        WHERE conditions for the given filters; a None filter is not applied.
+
+        Ranges are half-open: `*_after` is inclusive and `*_before` exclusive. The users table
+        indexes are laid out so every combination, under every SORT_KEYS ordering, has an
+        index-backed plan; see the User model.
+        """
+        conditions = []
+        if role is not None:
+            conditions.append(User.role == role)
+        if is_locked is not None:
+            conditions.append(User.is_locked == is_locked)
+        if email_verified is not None:
+            conditions.append(User.email_verified == email_verified)
+        if is_professional is not None:
+            conditions.append(User.is_professional == is_professional)
+        if created_after is not None:
+            conditions.append(User.created_at >= created_after)
+        if created_before is not None:
+            conditions.append(User.created_at < created_before)
+        if last_login_after is not None:
+            conditions.append(User.last_login_at >= last_login_after)
+        if last_login_before is not None:
+            conditions.append(User.last_login_at < last_login_before)
+        return conditions
+
+    @classmethod
+    async def stream_users(cls, session: AsyncSession, batch_size: int, **filters) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield batches of EXPORT_COLUMNS rows in (created_at, id) order from a server-side cursor.
+
+        Only one batch is held in memory at a time, and the next is fetched only when the caller
+        asks for it, so a slow consumer slows the scan instead of buffering it.
+
+        :param filters: Keyword filters accepted by `filter_conditions`.
+        """
+        query = (
+            select(*EXPORT_COLUMNS)
+            .where(*cls.filter_conditions(**filters))
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(query)
+        async for batch in result.partitions():
+            yield batch
+
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
     
 
+    @classmethod
+    async def attempt_login(cls, session: AsyncSession, email: str, password: str) -> Tuple[LoginOutcome, Optional[User]]:
+        """
+        Check a login and record its outcome, in one SELECT and one UPDATE.
+
+        The lookup reads only the columns needed to decide. The outcome is then written with a
+        single UPDATE ... RETURNING, so the failed-attempt counter and the lock are computed by
+        Postgres and concurrent attempts cannot lose increments. Nothing is committed: the
+        caller commits once, whatever the outcome.
+
+        :return: The outcome, and on success the user with its login recorded.
+        """
+        result = await session.execute(
+            select(User.id, User.hashed_password, User.email_verified, User.is_locked).where(User.email == email)
+        )
+        candidate = result.first()
+        if candidate is None:
+            return LoginOutcome.FAILED, None
+        if candidate.is_locked:
+            return LoginOutcome.LOCKED, None
+        if not candidate.email_verified:
+            return LoginOutcome.FAILED, None
+
+        if await password_hasher.verify(password, candidate.hashed_password, HashLane.LOGIN):
+            result = await session.execute(
+                update(User)
+                .where(User.id == candidate.id, User.is_locked.is_(False))
+                .values(failed_login_attempts=0, last_login_at=func.now())
+                .returning(User)
+                .execution_options(synchronize_session="fetch", populate_existing=True)
+            )
+            user = result.scalars().first()
+            invalidate_on_commit(session, candidate.id)
+            return (LoginOutcome.SUCCESS, user) if user else (LoginOutcome.LOCKED, None)
+
+        await session.execute(
+            update(User)
+            .where(User.id == candidate.id)
+            .values(
+                failed_login_attempts=User.failed_login_attempts + 1,
+                is_locked=User.is_locked | (User.failed_login_attempts + 1 >= get_settings().max_login_attempts),
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        invalidate_on_commit(session, candidate.id)
+        return LoginOutcome.FAILED, None
+
     @classmethod
     async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
-        return None
+        async with write_transaction(session):
+            outcome, user = await cls.attempt_login(session, email, password)
+        return user
 
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
@@ -146,49 +723,97 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
-        user = await cls.get_by_id(session, user_id)
-        if user:
+        hashed_password = await password_hasher.hash(new_password, HashLane.REGISTRATION)
+        async with write_transaction(session):
+            user = await cls.get_by_id(session, user_id)
+            if not user:
+                return False
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
-            await session.commit()
-            return True
-        return False
+            await RefreshTokenService.revoke_for_user(session, user.id)  # sign out every other session
+        user_cache.invalidate(user_id)
+        return True
 
     @classmethod
     async def verify_email_with_token(cls, session: AsyncSession, user_id: UUID, token: str) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if user and user.verification_token == token:
+        async with write_transaction(session):
+            user = await cls.get_by_id(session, user_id)
+            if not user or user.verification_token != token:
+                return False
             user.email_verified = True
             user.verification_token = None  # Clear the token once used
             user.role = UserRole.AUTHENTICATED
             session.add(user)
-            await session.commit()
-            return True
-        return False
+        user_cache.invalidate(user_id)
+        return True
 
     @classmethod
-    async def count(cls, session: AsyncSession) -> int:
+    async def count(cls, session: AsyncSession, **filters) -> int:
         """
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
+        :param filters: Keyword filters accepted by `filter_conditions`.
         :return: The count of users.
         """
-        query = select(func.count()).select_from(User)
+        query = select(func.count()).select_from(User).where(*cls.filter_conditions(**filters))
         result = await session.execute(query)
         count = result.scalar()
         return count
+
+    @classmethod
+    async def estimated_count(cls, session: AsyncSession) -> Optional[int]:
+        """
+        Read the planner's row estimate for the users table from pg_class.
+
+        :return: The estimate, or None if the table has never been analyzed.
+        """
+        result = await session.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"))
+        estimate = result.scalar()
+        return estimate if estimate is not None and estimate >= 0 else None
+
+    @classmethod
+    async def cached_count(cls, session: AsyncSession) -> int:
+        """
+        Return the cached user count, recounting exactly once it is older than the configured TTL.
+        """
+        count = user_count_cache.get()
+        if count is None:
+            count = await cls.count(session)
+            user_count_cache.set(count, get_settings().user_count_cache_ttl)
+        return count
+
+    @classmethod
+    async def count_users(cls, session: AsyncSession, strategy: CountStrategy, **filters) -> Tuple[int, CountStrategy]:
+        """
+        Count users with the given strategy.
+
+        WINDOW only applies alongside a page query (see `list_users_with_total`), so here it is
+        answered exactly, as is ESTIMATED when no statistics exist yet. The estimate and the
+        cache describe the whole table, so a filtered count is always exact.
+
+        :return: The count and the strategy that actually produced it.
+        """
+        if cls.filter_conditions(**filters):
+            return await cls.count(session, **filters), CountStrategy.EXACT
+        if strategy is CountStrategy.ESTIMATED:
+            estimate = await cls.estimated_count(session)
+            if estimate is not None:
+                return estimate, CountStrategy.ESTIMATED
+        elif strategy is CountStrategy.CACHED:
+            return await cls.cached_count(session), CountStrategy.CACHED
+        return await cls.count(session), CountStrategy.EXACT
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if user and user.is_locked:
+        async with write_transaction(session):
+            user = await cls.get_by_id(session, user_id)
+            if not user or not user.is_locked:
+                return False
             user.is_locked = False
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
-            await session.commit()
-            return True
-        return False
+        user_cache.invalidate(user_id)
+        return True
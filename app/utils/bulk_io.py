@@ -0,0 +1,107 @@
+"""
+Incremental NDJSON and CSV reading and writing for streamed request and response bodies.
+
+Both readers consume an async iterator of byte chunks, such as `Request.stream()`, and yield
+one record at a time, so an upload of any size is held in memory only a line at a time. The
+writers turn batches of rows into text a batch at a time for the same reason.
+"""
+from builtins import ValueError, bytes, dict, int, isinstance, len, next, str, zip
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+from typing import Any, AsyncIterator, Dict, Iterable, List, Sequence, Tuple, Union
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    A streaming response whose body is produced while the request body is still being read.
+
+    StreamingResponse watches `receive` for a disconnect while it streams, which would swallow
+    the request body chunks the generator is waiting for. Here the generator is the only reader;
+    a client that goes away surfaces as ClientDisconnect from `Request.stream()`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines, without their line endings."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8-sig")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8-sig")
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[Dict, ValueError]]]:
+    """
+    Yield (row number, object) for each non-blank line. A line that is not a JSON object yields
+    a ValueError in place of the object so the caller can report it against its row.
+    """
+    row = 0
+    async for line in aiter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        yield row, record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[Dict, ValueError]]]:
+    """
+    Yield (row number, record) for each CSV data row, keyed by the header row. Empty cells are
+    omitted so optional fields fall back to their defaults. Quoted fields may span lines.
+    """
+    header: List[str] = []
+    pending = ""
+    row = 0
+    async for line in aiter_lines(chunks):
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue  # inside a quoted field that continues on the next line
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if not header:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, found {len(values)}")
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+def ndjson_batch(columns: Sequence[str], rows: Iterable[Sequence]) -> str:
+    """Render a batch of rows as NDJSON objects keyed by `columns`."""
+    return "".join(json.dumps({name: _plain(value) for name, value in zip(columns, row)}) + "\n" for row in rows)
+
+def csv_batch(rows: Iterable[Sequence]) -> str:
+    """Render a batch of rows (or a header, as a one-row batch) as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([["" if value is None else _plain(value) for value in row] for row in rows])
+    return buffer.getvalue()
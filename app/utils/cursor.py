@@ -0,0 +1,88 @@
+from builtins import KeyError, TypeError, ValueError, bool, dict, float, isinstance, len, str
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+class Cursor(NamedTuple):
+    """A position in the (created_at, id) ordering of users, and which way to read from it."""
+    created_at: datetime
+    id: UUID
+    backwards: bool = False
+
+def encode_cursor(created_at: datetime, user_id: UUID, backwards: bool = False) -> str:
+    """Pack a keyset position into an opaque URL-safe token."""
+    payload = {"c": created_at.isoformat(), "i": str(user_id)}
+    if backwards:
+        payload["b"] = 1
+    return _pack(payload)
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Unpack a token produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        payload = _unpack(token)
+        return Cursor(datetime.fromisoformat(payload["c"]), UUID(payload["i"]), bool(payload.get("b")))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+class RankCursor(NamedTuple):
+    """A position in the (rank DESC, id DESC) ordering of search results."""
+    rank: float
+    id: UUID
+
+def _pack(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _unpack(token: str) -> dict:
+    payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid pagination cursor")
+    return payload
+
+def encode_rank_cursor(rank: float, user_id: UUID) -> str:
+    """Pack a search result position; the rank survives the JSON round trip exactly."""
+    return _pack({"r": rank, "i": str(user_id)})
+
+def decode_rank_cursor(token: str) -> RankCursor:
+    """
+    Unpack a token produced by `encode_rank_cursor`.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        payload = _unpack(token)
+        return RankCursor(float(payload["r"]), UUID(payload["i"]))
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def page_cursors(items: Sequence, cursor: Optional[Cursor], has_more: bool) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Work out the next and previous cursors for a page fetched with `cursor`.
+
+    `items` must be in ascending (created_at, id) order and expose `created_at` and `id`;
+    `has_more` says whether more rows exist beyond the page in the direction it was read.
+    """
+    if not items:
+        if cursor is None:
+            return None, None
+        # An empty page past either end: offer the way back to where we came from.
+        if cursor.backwards:
+            return encode_cursor(cursor.created_at, cursor.id), None
+        return None, encode_cursor(cursor.created_at, cursor.id, backwards=True)
+
+    first, last = items[0], items[-1]
+    if cursor is not None and cursor.backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+    next_cursor = encode_cursor(last.created_at, last.id) if has_next else None
+    prev_cursor = encode_cursor(first.created_at, first.id, backwards=True) if has_prev else None
+    return next_cursor, prev_cursor
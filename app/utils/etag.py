@@ -0,0 +1,40 @@
+from builtins import bool, str
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+def user_etag(user_id: UUID, updated_at: Optional[datetime], fields: Optional[Tuple[str, ...]] = None, links: bool = True) -> str:
+    """
+    Strong ETag for a user representation; it changes whenever the row's updated_at does.
+
+    Trimmed representations (`fields`, or `links=False`) hash their shape in too, so no two
+    different bodies share a strong tag. The full representation's tag is the one If-Match is
+    compared against.
+    """
+    version = updated_at.isoformat() if updated_at is not None else ""
+    key = f"{user_id}:{version}"
+    if fields is not None:
+        key += ":" + ",".join(fields)
+    if not links and (fields is None or "links" in fields):
+        key += ":nolinks"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Whether an If-None-Match (weak comparison) or If-Match (strong, `weak=False`) header value
+    matches `etag`. Both accept `*` and comma-separated lists.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
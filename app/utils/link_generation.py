@@ -1,5 +1,5 @@
-from builtins import dict, int, max, str
-from typing import List, Callable
+from builtins import dict, int, len, max, object, str
+from typing import Dict, List, Callable, Optional, Tuple
 from urllib.parse import urlencode
 from uuid import UUID
 
@@ -7,42 +7,112 @@ from fastapi import Request
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
+# (rel, route name, HTTP method, action) of the links every user representation carries.
+USER_ACTIONS = (
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete"),
+)
+_USER_ID_PLACEHOLDER = "__user_id__"
+_MAX_TEMPLATE_SETS = 64
+
 # Utility function to create a link
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
 
-def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
+def create_pagination_link(rel: str, base_url: str, params: dict, extra: str = "") -> PaginationLink:
+    """
+    Build a skip/limit link. `extra` is an already encoded query string appended to it.
+
+    Links are built from URLs the app generated itself, so they skip HttpUrl validation.
+    """
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    if extra:
+        query_string = f"{query_string}&{extra}"
+    return PaginationLink.model_construct(rel=rel, href=f"{base_url}?{query_string}", method="GET")
+
+def create_cursor_link(rel: str, base_url: str, cursor: str, limit: int, extra: str = "") -> PaginationLink:
+    query_string = urlencode({'cursor': cursor, 'limit': limit})
+    if extra:
+        query_string = f"{query_string}&{extra}"
+    return PaginationLink.model_construct(rel=rel, href=f"{base_url}?{query_string}", method="GET")
+
+class UserLinkTemplates:
+    """
+    The user action URLs of one app and base URL, resolved once with a placeholder id.
+
+    Producing a user's links is then string concatenation: no route lookup per user and no
+    HttpUrl parsing, so list pages can afford links on every item.
+    """
+    __slots__ = ("parts",)
+
+    def __init__(self, request: Request):
+        self.parts: List[Tuple[str, str, str, str]] = []
+        for rel, route_name, method, action in USER_ACTIONS:
+            url = str(request.url_for(route_name, user_id=_USER_ID_PLACEHOLDER))
+            prefix, suffix = url.split(_USER_ID_PLACEHOLDER, 1)
+            self.parts.append((rel, action, prefix, suffix))
+
+    def for_user(self, user_id: UUID) -> List[dict]:
+        """The user's links as plain dicts in the Link schema's shape."""
+        user_id = str(user_id)
+        return [
+            {"rel": rel, "href": f"{prefix}{user_id}{suffix}", "action": action, "type": "application/json"}
+            for rel, action, prefix, suffix in self.parts
+        ]
+
+_user_link_templates: Dict[Tuple[object, str], UserLinkTemplates] = {}
+
+def user_link_templates(request: Request) -> UserLinkTemplates:
+    """Return the link templates for the request's app and base URL, resolving them on first use."""
+    key = (request.app, str(request.base_url))
+    templates = _user_link_templates.get(key)
+    if templates is None:
+        if len(_user_link_templates) >= _MAX_TEMPLATE_SETS:
+            _user_link_templates.clear()  # base URLs follow the Host header; keep the map bounded
+        templates = _user_link_templates[key] = UserLinkTemplates(request)
+    return templates
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
-    return [
-        create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
-    ]
+    return [Link(**link) for link in user_link_templates(request).for_user(user_id)]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int, params: Optional[dict] = None) -> List[PaginationLink]:
+    """
+    Build skip/limit pagination links. `params` are further query parameters every link carries.
+    """
+    base_url = str(request.url).split("?", 1)[0]
+    extra = urlencode(params) if params else ""
     total_pages = (total_items + limit - 1) // limit
     links = [
-        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
-        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
+        create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}, extra),
+        create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}, extra),
+        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit}, extra)
     ]
 
     if skip + limit < total_items:
-        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
+        links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}, extra))
 
     if skip > 0:
-        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}))
+        links.append(create_pagination_link("prev", base_url, {'skip': max(skip - limit, 0), 'limit': limit}, extra))
 
     return links
+
+def generate_cursor_pagination_links(request: Request, limit: int, cursor: Optional[str], next_cursor: Optional[str], prev_cursor: Optional[str], params: Optional[dict] = None) -> List[PaginationLink]:
+    """
+    Build pagination links for keyset paging. An empty `cursor` value starts at the first page.
+    """
+    base_url = str(request.url).split("?", 1)[0]
+    extra = urlencode(params) if params else ""
+    links = [
+        create_cursor_link("self", base_url, cursor or "", limit, extra),
+        create_cursor_link("first", base_url, "", limit, extra),
+    ]
+    if next_cursor:
+        links.append(create_cursor_link("next", base_url, next_cursor, limit, extra))
+    if prev_cursor:
+        links.append(create_cursor_link("prev", base_url, prev_cursor, limit, extra))
+    return links
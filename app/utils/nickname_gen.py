@@ -1,10 +1,40 @@
-from builtins import str
+from builtins import len, list, max, min, set, str
 import random
+from typing import List
 
+ADJECTIVES = [
+    "clever", "jolly", "brave", "sly", "gentle", "agile", "bold", "bright", "calm", "cheery",
+    "cosmic", "crafty", "curious", "daring", "dapper", "eager", "fancy", "fearless", "fluffy", "frosty",
+    "fuzzy", "glad", "golden", "graceful", "happy", "hardy", "humble", "keen", "kind", "lively",
+    "lucky", "mellow", "merry", "mighty", "nimble", "noble", "patient", "peppy", "plucky", "polite",
+    "proud", "quick", "quiet", "quirky", "rapid", "rustic", "savvy", "serene", "shiny", "silent",
+    "silly", "snappy", "speedy", "spry", "steady", "sunny", "swift", "tidy", "trusty", "vivid",
+    "wise", "witty", "zany", "zesty",
+]
+ANIMALS = [
+    "panda", "fox", "raccoon", "koala", "lion", "badger", "beaver", "bison", "camel", "cheetah",
+    "cobra", "condor", "cougar", "coyote", "crane", "dingo", "dolphin", "eagle", "falcon", "ferret",
+    "finch", "gecko", "gibbon", "giraffe", "gopher", "hawk", "hedgehog", "heron", "hippo", "ibis",
+    "jackal", "jaguar", "kestrel", "lemur", "leopard", "llama", "lynx", "magpie", "marmot", "meerkat",
+    "mole", "moose", "narwhal", "ocelot", "otter", "owl", "panther", "parrot", "pelican", "penguin",
+    "puffin", "quokka", "rabbit", "raven", "salmon", "seal", "sparrow", "stork", "tapir", "tiger",
+    "toucan", "walrus", "weasel", "wombat",
+]
+MAX_NUMBER_DIGITS = 6  # keeps the longest name within the 30-character nickname limit
 
-def generate_nickname() -> str:
+def nickname_space(number_digits: int = 4) -> int:
+    """How many distinct nicknames the generator can produce with `number_digits` digits."""
+    return len(ADJECTIVES) * len(ANIMALS) * 10 ** min(max(number_digits, 1), MAX_NUMBER_DIGITS)
+
+def generate_nickname(number_digits: int = 4) -> str:
     """Generate a URL-safe nickname using adjectives and animal names."""
-    adjectives = ["clever", "jolly", "brave", "sly", "gentle"]
-    animals = ["panda", "fox", "raccoon", "koala", "lion"]
-    number = random.randint(0, 999)
-    return f"{random.choice(adjectives)}_{random.choice(animals)}_{number}"
+    number = random.randrange(10 ** min(max(number_digits, 1), MAX_NUMBER_DIGITS))
+    return f"{random.choice(ADJECTIVES)}_{random.choice(ANIMALS)}_{number}"
+
+def generate_nicknames(count: int, number_digits: int = 4) -> List[str]:
+    """Generate `count` distinct nicknames, to be checked against the database in one query."""
+    count = min(count, nickname_space(number_digits))
+    names = set()
+    while len(names) < count:
+        names.add(generate_nickname(number_digits))
+    return list(names)
@@ -0,0 +1,82 @@
+"""
+Fast JSON rendering for user responses.
+
+Users read back from the database were validated when they were written, so the user endpoints
+do not run them through pydantic again on the way out. Each user is copied into a dict of the
+UserResponse fields with one attrgetter call, and the body is encoded by orjson. Returning the
+response directly also skips FastAPI's second validation against `response_model`, which is
+kept on the routes for the OpenAPI schema only.
+"""
+from builtins import TypeError, ValueError, dict, getattr, isinstance, len, sorted, str, tuple, zip
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from uuid import UUID
+import orjson
+from fastapi.responses import ORJSONResponse
+from app.schemas.pagination_schema import PaginationLink
+from app.schemas.user_schemas import UserResponse
+from app.utils.link_generation import UserLinkTemplates
+
+# Links are not stored on the user; they are added from UserLinkTemplates when wanted.
+USER_RESPONSE_FIELDS = tuple(field for field in UserResponse.model_fields if field != "links")
+
+@lru_cache(maxsize=128)
+def _values(names: Tuple[str, ...]) -> Callable[[Any], tuple]:
+    if len(names) > 1:
+        return attrgetter(*names)
+    return lambda user: tuple(getattr(user, name) for name in names)
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a comma-separated `fields` query value against UserResponse.
+
+    :return: The requested fields in schema order, or None when `value` is None (all fields).
+    :raises ValueError: If a field is unknown or none is given.
+    """
+    if value is None:
+        return None
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    unknown = requested.difference(UserResponse.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in UserResponse.model_fields if field in requested)
+
+def field_columns(fields: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    """The user attributes behind `fields`: every field but links, which is not a column."""
+    if fields is None:
+        return USER_RESPONSE_FIELDS
+    return tuple(field for field in fields if field != "links")
+
+def user_to_dict(user, links: Optional[UserLinkTemplates] = None, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """
+    The UserResponse fields of an ORM user or CachedUser as a plain dict, with links if given
+    templates. With `fields` only those are read, so unloaded columns are never touched, and
+    links are only added if they are among them.
+    """
+    names = field_columns(fields)
+    item = dict(zip(names, _values(names)(user)))
+    if links is not None and (fields is None or "links" in fields):
+        item["links"] = links.for_user(user.id)
+    return item
+
+def users_to_dicts(users: Iterable, links: Optional[UserLinkTemplates] = None, fields: Optional[Tuple[str, ...]] = None) -> List[dict]:
+    return [user_to_dict(user, links, fields) for user in users]
+
+def pagination_links_to_dicts(links: Iterable[PaginationLink]) -> List[dict]:
+    """Pagination links as dicts; they are built unvalidated, so model_dump would warn about href."""
+    return [{"rel": link.rel, "href": str(link.href), "method": link.method} for link in links]
+
+def _default(value: Any):
+    # asyncpg returns its own UUID subclass, which orjson only encodes natively as uuid.UUID.
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes the UUID subclasses database drivers return."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,31 +1,133 @@
 # smtp_client.py
-from builtins import Exception, int, str
-import smtplib
+from builtins import Exception, RuntimeError, bool, float, int, str
+import asyncio
+import time
+from typing import List, Optional
+import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from settings.config import settings
 import logging
 
-class SMTPClient:
-    def __init__(self, server: str, port: int, username: str, password: str):
+class _PooledConnection:
+    __slots__ = ("smtp", "last_used", "messages_sent")
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+class AsyncSMTPClient:
+    """
+    Sends email over a pool of persistent, authenticated asyncio SMTP connections.
+
+    Connections are opened on demand up to `pool_size` and reused across messages, so the
+    TCP/STARTTLS/LOGIN handshake is paid once per connection rather than once per email.
+    A connection idle for longer than `health_check_after` is probed with NOOP before reuse,
+    one idle for longer than `idle_timeout` is closed and replaced, and one that has sent
+    `max_messages` is retired with QUIT.
+    """
+
+    def __init__(self, server: str, port: int, username: str, password: str, pool_size: int = 4,
+                 idle_timeout: float = 60.0, health_check_after: float = 5.0, max_messages: int = 100,
+                 start_tls: bool = True, timeout: float = 30.0, sender: Optional[str] = None):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.max_messages = max_messages
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.sender = sender or username
+        self._idle: List[_PooledConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _bind_loop(self):
+        # Connections and the semaphore belong to one event loop; start afresh on a new one.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            for connection in self._idle:
+                try:
+                    connection.smtp.close()
+                except RuntimeError:
+                    pass  # the old loop is already closed, taking the transport with it
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._loop = loop
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.server,
+            port=self.port,
+            username=self.username or None,
+            password=self.password or None,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        return _PooledConnection(smtp)
 
-    def send_email(self, subject: str, html_content: str, recipient: str):
+    async def _checkout(self) -> _PooledConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            idle_for = time.monotonic() - connection.last_used
+            if idle_for > self.idle_timeout or not connection.smtp.is_connected:
+                await self._discard(connection)
+                continue
+            if idle_for > self.health_check_after:
+                try:
+                    await connection.smtp.noop()
+                except aiosmtplib.SMTPException:
+                    await self._discard(connection)
+                    continue
+            return connection
+        return await self._connect()
+
+    def _checkin(self, connection: _PooledConnection):
+        connection.last_used = time.monotonic()
+        self._idle.append(connection)
+
+    async def _discard(self, connection: _PooledConnection, polite: bool = False):
         try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
-
-            with smtplib.SMTP(self.server, self.port) as server:
-                server.starttls()  # Use TLS
-                server.login(self.username, self.password)
-                server.sendmail(self.username, recipient, message.as_string())
-            logging.info(f"Email sent to {recipient}")
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
-            raise
+            if polite and connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except aiosmtplib.SMTPException:
+            pass
+        finally:
+            connection.smtp.close()
+
+    async def send_email(self, subject: str, html_content: str, recipient: str, text_content: Optional[str] = None):
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = recipient
+        if text_content is not None:
+            message.attach(MIMEText(text_content, 'plain'))
+        message.attach(MIMEText(html_content, 'html'))
+
+        self._bind_loop()
+        async with self._slots:
+            connection = None
+            try:
+                connection = await self._checkout()
+                await connection.smtp.send_message(message)
+            except Exception as e:
+                if connection is not None:
+                    await self._discard(connection)
+                logging.error(f"Failed to send email: {str(e)}")
+                raise
+            connection.messages_sent += 1
+            if connection.messages_sent >= self.max_messages:
+                await self._discard(connection, polite=True)
+            else:
+                self._checkin(connection)
+        logging.info(f"Email sent to {recipient}")
+
+    async def close(self):
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._discard(connection, polite=True)
@@ -1,7 +1,58 @@
+import html
+import os
+import re
+import secrets
+import string
 import markdown2
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+class _Slot(NamedTuple):
+    field: str
+    format_spec: str
+    conversion: Optional[str]
+
+_formatter = string.Formatter()
+
+class CompiledTemplate:
+    """
+    A template already run through markdown and styling, split into literal text and slots.
+
+    Rendering only joins the literals with the formatted context values, so the markdown cost
+    is paid once per template rather than once per recipient.
+    """
+    __slots__ = ("html_parts", "text_parts", "mtimes")
+
+    def __init__(self, html_parts: List, text_parts: List, mtimes: Tuple[int, ...]):
+        self.html_parts = html_parts
+        self.text_parts = text_parts
+        self.mtimes = mtimes
+
+    @staticmethod
+    def _fill(parts: List, context: dict, escape: bool) -> str:
+        out = []
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            # Resolved as str.format would, so {user.name}, {items[0]} and {x:{width}} still work.
+            value, _ = _formatter.get_field(part.field, (), context)
+            value = _formatter.convert_field(value, part.conversion)
+            format_spec = _formatter.vformat(part.format_spec, (), context) if "{" in part.format_spec else part.format_spec
+            value = format(value, format_spec)
+            out.append(html.escape(value) if escape else value)
+        return "".join(out)
+
+    def render_html(self, **context) -> str:
+        return self._fill(self.html_parts, context, escape=True)
+
+    def render_text(self, **context) -> str:
+        return self._fill(self.text_parts, context, escape=False)
 
 class TemplateManager:
+    # Shared by every instance; entries are recompiled when any source file's mtime changes.
+    _compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+
     def __init__(self):
         # Dynamically determine the root path of the project
         self.root_dir = Path(__file__).resolve().parent.parent.parent  # Adjust this depending on the structure
@@ -32,15 +83,57 @@ class TemplateManager:
                 styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
         return styled_html
 
-    def render_template(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
+    def _to_plain_text(self, markdown: str) -> str:
+        """Reduce markdown to a readable plain-text alternative."""
+        text = re.sub(r'!\[[^\]]*\]\([^)]*\)\n?', '', markdown)  # drop images
+        text = re.sub(r'\[([^\]]*)\]\(#?\)', r'\1', text)  # links without a target
+        text = re.sub(r'\[([^\]]*)\]\(([^)]+)\)', r'\1: \2', text)
+        text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
+        text = re.sub(r'(\*\*|__|\*|_)(\S.*?\S|\S)\1', r'\2', text)
+        return text.strip() + "\n"
+
+    def _source_files(self, template_name: str) -> List[Path]:
+        return [self.templates_dir / 'header.md', self.templates_dir / f'{template_name}.md', self.templates_dir / 'footer.md']
+
+    def _compile(self, template_name: str, mtimes: Tuple[int, ...]) -> CompiledTemplate:
         header = self._read_template('header.md')
         footer = self._read_template('footer.md')
-
-        # Read main template and format it with provided context
         main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
 
-        full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        # Swap each {placeholder} for an inert token, render once, then split on the tokens.
+        marker = f"tmplslot{secrets.token_hex(4)}"
+        slots: List[_Slot] = []
+        tokenized = []
+        for literal, field, format_spec, conversion in _formatter.parse(main_template):
+            tokenized.append(literal)
+            if field is not None:
+                tokenized.append(f"{marker}{len(slots)}x")
+                slots.append(_Slot(field, format_spec or '', conversion))
+        full_markdown = f"{header}\n{''.join(tokenized)}\n{footer}"
+
+        token_pattern = re.compile(rf"{marker}(\d+)x")
+
+        def split(rendered: str) -> List:
+            parts = token_pattern.split(rendered)
+            return [slots[int(part)] if i % 2 else part for i, part in enumerate(parts) if i % 2 or part]
+
+        html_content = self._apply_email_styles(markdown2.markdown(full_markdown))
+        return CompiledTemplate(split(html_content), split(self._to_plain_text(full_markdown)), mtimes)
+
+    def get_compiled(self, template_name: str) -> CompiledTemplate:
+        """Return the compiled template, recompiling if a source file changed on disk."""
+        mtimes = tuple(os.stat(path).st_mtime_ns for path in self._source_files(template_name))
+        key = (str(self.templates_dir), template_name)
+        compiled = self._compiled.get(key)
+        if compiled is None or compiled.mtimes != mtimes:
+            compiled = self._compile(template_name, mtimes)
+            self._compiled[key] = compiled
+        return compiled
+
+    def render_template(self, template_name: str, **context) -> str:
+        """Render a markdown template with given context, applying advanced email styles."""
+        return self.get_compiled(template_name).render_html(**context)
+
+    def render_text(self, template_name: str, **context) -> str:
+        """Render the plain-text alternative of a template with given context."""
+        return self.get_compiled(template_name).render_text(**context)
@@ -0,0 +1,68 @@
+"""
+Per-item cost of rendering a GET /users/ page, pydantic path against the fast path.
+
+Run with `python -m benchmarks.user_serialization`. No database is needed: pages are built
+from transient User instances, which read attributes through the same ORM instrumentation as
+loaded rows.
+
+- pydantic: UserResponse.model_validate per row into a UserListResponse, then FastAPI's
+  response_model validation and serialization and the stdlib JSON encoder, as the endpoint
+  did before.
+- fast: app.utils.serialization dicts encoded by FastJSONResponse, as it does now.
+"""
+import asyncio
+import time
+import uuid
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.serialization import FastJSONResponse, users_to_dicts
+
+PAGE_SIZES = (10, 100, 1000)
+MIN_SECONDS = 1.0
+
+response_field = create_response_field("Response_list_users", UserListResponse)
+
+def make_page(size: int):
+    return [
+        User(
+            id=uuid.uuid4(), email=f"user{i}@example.com", nickname=f"clever_fox_{i}", first_name="John",
+            last_name="Doe", bio="Experienced software developer.", profile_picture_url="https://example.com/john.jpg",
+            linkedin_profile_url="https://linkedin.com/in/johndoe", github_profile_url="https://github.com/johndoe",
+            role=UserRole.AUTHENTICATED, is_professional=False,
+        )
+        for i in range(size)
+    ]
+
+async def render_pydantic(users) -> bytes:
+    items = [UserResponse.model_validate(user) for user in users]
+    content = UserListResponse(items=items, total=len(items), page=1, size=len(items), links=[])
+    return JSONResponse(await serialize_response(field=response_field, response_content=content)).body
+
+async def render_fast(users) -> bytes:
+    return FastJSONResponse({"items": users_to_dicts(users), "total": len(users), "total_strategy": "exact", "page": 1, "size": len(users), "links": []}).body
+
+async def per_item_us(render, users) -> float:
+    """Mean microseconds per user, repeating the render for at least MIN_SECONDS."""
+    await render(users)  # warm up
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        await render(users)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / runs / len(users) * 1e6
+
+async def main():
+    print(f"{'page size':>9}  {'pydantic us/item':>16}  {'fast us/item':>12}  {'speedup':>7}")
+    for size in PAGE_SIZES:
+        users = make_page(size)
+        slow = await per_item_us(render_pydantic, users)
+        fast = await per_item_us(render_fast, users)
+        print(f"{size:>9}  {slow:>16.2f}  {fast:>12.2f}  {slow / fast:>6.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
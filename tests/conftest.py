@@ -31,11 +31,13 @@ from faker import Faker
 from app.main import app
 from app.database import Base, Database
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import get_db, get_read_db, get_read_session_factory, get_session_factory, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token, decode_token
+from app.services.user_service import user_cache
+from settings.config import override_settings
 
 fake = Faker()
 
@@ -56,13 +58,18 @@ def email_service():
 
 # this is what creates the http client for your api tests
 @pytest.fixture(scope="function")
-async def async_client(db_session):
-    async with AsyncClient(app=app, base_url="http://testserver") as client:
-        app.dependency_overrides[get_db] = lambda: db_session
-        try:
-            yield client
-        finally:
-            app.dependency_overrides.clear()
+async def async_client(db_session, tmp_path):
+    # Fresh rate limit buckets per test; every test client shares one IP.
+    with override_settings(rate_limit_store=str(tmp_path / "rate-limits")):
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            app.dependency_overrides[get_db] = lambda: db_session
+            app.dependency_overrides[get_read_db] = lambda: db_session
+            app.dependency_overrides[get_session_factory] = lambda: AsyncTestingSessionLocal
+            app.dependency_overrides[get_read_session_factory] = lambda: AsyncTestingSessionLocal
+            try:
+                yield client
+            finally:
+                app.dependency_overrides.clear()
 
 @pytest.fixture(scope="session", autouse=True)
 def initialize_database():
@@ -74,6 +81,7 @@ def initialize_database():
 # this function setup and tears down (drops tales) for each test function, so you have a clean database for each test.
 @pytest.fixture(scope="function", autouse=True)
 async def setup_database():
+    user_cache.clear()  # ids and emails are reused across tests
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -165,10 +173,10 @@ async def users_with_same_role_50_users(db_session):
     users = []
     for _ in range(50):
         user_data = {
-            "nickname": fake.user_name(),
+            "nickname": fake.unique.user_name(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
-            "email": fake.email(),
+            "email": fake.unique.email(),
             "hashed_password": fake.password(),
             "role": UserRole.AUTHENTICATED,
             "email_verified": False,
@@ -0,0 +1,40 @@
+import pytest
+from app.dependencies import get_settings
+
+@pytest.mark.asyncio
+async def test_reload_settings_as_admin(async_client, admin_token):
+    before = get_settings()
+    response = await async_client.post("/admin/settings/reload", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert get_settings() is not before
+
+@pytest.mark.asyncio
+async def test_reload_settings_as_manager_forbidden(async_client, manager_token):
+    response = await async_client.post("/admin/settings/reload", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_as_admin(async_client, admin_token):
+    response = await async_client.get("/admin/stats/db-pool", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert {"checkouts", "wait_avg_ms", "overflow_peak", "invalidations"} <= response.json().keys()
+    assert response.json()["replicas"] == []
+
+@pytest.mark.asyncio
+async def test_token_cache_stats_as_admin(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    await async_client.get("/admin/stats/token-cache", headers=headers)
+    response = await async_client.get("/admin/stats/token-cache", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["hits"] >= 1
+    assert {"size", "misses", "hit_rate"} <= response.json().keys()
+
+@pytest.mark.asyncio
+async def test_user_cache_stats_as_admin(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for _ in range(2):
+        await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    response = await async_client.get("/admin/stats/user-cache", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["hits"] == 1
+    assert response.json()["hit_rate"] == 0.5
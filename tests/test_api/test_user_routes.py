@@ -9,7 +9,7 @@ async def test_register_route_success(async_client, monkeypatch):
     from unittest.mock import MagicMock, patch
     
     # Mock SMTP send_email to prevent actual email sending
-    with patch('app.utils.smtp_connection.SMTPClient.send_email'):
+    with patch('app.utils.smtp_connection.AsyncSMTPClient.send_email'):
         user_data = {
             "email": "new_user@example.com",
             "password": "StrongPassword123!",
@@ -1,8 +1,15 @@
 from builtins import str
+import json
+import time
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+from unittest.mock import patch
 from app.main import app
+from app.middleware.read_your_writes import COOKIE_NAME
+from settings.config import override_settings
 from app.models.user_model import User
+from app.services.user_service import UserService, user_cache
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
@@ -103,6 +110,34 @@ async def test_login_success(async_client, verified_user):
     decoded_token = decode_token(data["access_token"])
     assert decoded_token is not None, "Failed to decode token"
     assert decoded_token["role"] == "AUTHENTICATED", "The user role should be AUTHENTICATED"
+    assert data["refresh_token"]
+
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(async_client, verified_user):
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    login = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    refresh_token = login.json()["refresh_token"]
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert decode_token(data["access_token"])["sub"] == verified_user.email
+    assert data["refresh_token"] != refresh_token
+
+    reused = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert reused.status_code == 401
+    revoked = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert revoked.status_code == 401
+
+@pytest.mark.asyncio
+async def test_revoke_refresh_token(async_client, verified_user):
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    login = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    refresh_token = login.json()["refresh_token"]
+    response = await async_client.post("/token/revoke", json={"refresh_token": refresh_token})
+    assert response.status_code == 204
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
 
 @pytest.mark.asyncio
 async def test_login_user_not_found(async_client):
@@ -174,6 +209,59 @@ async def test_list_users_as_admin(async_client, admin_token):
     assert response.status_code == 200
     assert 'items' in response.json()
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"limit": 101}, {"skip": -1}, {"limit": 0, "cursor": "x"}])
+async def test_list_users_rejects_out_of_range_paging(async_client, admin_token, params):
+    response = await async_client.get("/users/", params=params, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_list_users_links_opt_out(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    item = (await async_client.get("/users/", headers=headers)).json()["items"][0]
+    assert [link["rel"] for link in item["links"]] == ["self", "update", "delete"]
+    assert item["links"][0]["href"].endswith(f"/users/{item['id']}")
+
+    body = (await async_client.get("/users/", params={"links": "false"}, headers=headers)).json()
+    assert "links" not in body["items"][0]
+    assert all(link["href"].endswith("&links=false") for link in body["links"])
+    response = await async_client.get(f"/users/{admin_user.id}", params={"links": "false"}, headers=headers)
+    assert "links" not in response.json()
+
+@pytest.mark.asyncio
+async def test_users_sparse_fieldsets(async_client, admin_user, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    body = (await async_client.get("/users/", params={"fields": "id,email,role", "limit": 5}, headers=headers)).json()
+    assert [set(item) for item in body["items"]] == [{"id", "email", "role"}] * 5
+    assert all("fields=email%2Cid%2Crole" in link["href"] for link in body["links"])
+
+    body = (await async_client.get("/users/", params={"fields": "email,links", "cursor": ""}, headers=headers)).json()
+    assert set(body["items"][0]) == {"email", "links"}
+
+    response = await async_client.get(f"/users/{admin_user.id}", params={"fields": "nickname"}, headers=headers)
+    assert response.json() == {"nickname": admin_user.nickname}
+
+    response = await async_client.get("/users/", params={"fields": "id,hashed_password"}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_filters_and_sort(async_client, admin_user, manager_user, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    body = (await async_client.get("/users/", params={"role": "MANAGER", "limit": 5}, headers=headers)).json()
+    assert [item["email"] for item in body["items"]] == [manager_user.email]
+    assert body["total"] == 1 and body["total_strategy"] == "exact"
+    assert all("role=MANAGER" in link["href"] for link in body["links"])
+
+    body = (await async_client.get("/users/", params={"sort": "-email", "is_locked": "false", "limit": 100}, headers=headers)).json()
+    emails = [item["email"] for item in body["items"]]
+    assert emails == sorted(emails, reverse=True)
+    assert all("sort=-email" in link["href"] and "is_locked=false" in link["href"] for link in body["links"])
+
+    response = await async_client.get("/users/", params={"sort": "hashed_password"}, headers=headers)
+    assert response.status_code == 422
+    response = await async_client.get("/users/", params={"sort": "email", "cursor": ""}, headers=headers)
+    assert response.status_code == 400
+
 @pytest.mark.asyncio
 async def test_list_users_as_manager(async_client, manager_token):
     response = await async_client.get(
@@ -189,3 +277,182 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_list_users_by_cursor(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/", params={"cursor": "", "limit": 20}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == 20
+    assert body["page"] is None
+    links = {link["rel"]: link["href"] for link in body["links"]}
+    assert "next" in links and "prev" not in links
+
+    response = await async_client.get(links["next"], headers=headers)
+    assert response.status_code == 200
+    second = response.json()
+    assert {item["id"] for item in second["items"]}.isdisjoint(item["id"] for item in body["items"])
+    assert "prev" in {link["rel"] for link in second["links"]}
+
+@pytest.mark.asyncio
+async def test_list_users_invalid_cursor(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/", params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_window_count(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with override_settings(user_count_strategy="window"):
+        response = await async_client.get("/users/", params={"skip": 10, "limit": 10}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 51
+    assert body["total_strategy"] == "window"
+    assert body["size"] == 10
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_ndjson(async_client, admin_token):
+    body = "\n".join([
+        json.dumps({"email": "bulk_api_1@example.com", "password": "ValidPassword123!"}),
+        json.dumps({"email": "bulk_api_2@example.com", "password": "short"}),
+    ])
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "application/x-ndjson"}
+    response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.get("status") for line in lines[:2]] == ["created", "failed"]
+    assert lines[-1] == {"summary": {"created": 1, "failed": 1}}
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_csv(async_client, admin_token):
+    body = "email,password,first_name\nbulk_csv@example.com,ValidPassword123!,Casey\n"
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "text/csv"}
+    response = await async_client.post("/users/bulk", content=body, headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[0])["status"] == "created"
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_requires_admin(async_client, manager_token):
+    headers = {"Authorization": f"Bearer {manager_token}", "Content-Type": "application/x-ndjson"}
+    response = await async_client.post("/users/bulk", content="{}", headers=headers)
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_rejects_unknown_format(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "application/xml"}
+    response = await async_client.post("/users/bulk", content="<users/>", headers=headers)
+    assert response.status_code == 415
+
+@pytest.mark.asyncio
+async def test_export_users_ndjson(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with override_settings(export_batch_size=7):
+        response = await async_client.get("/users/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 51
+    assert "hashed_password" not in rows[0] and "verification_token" not in rows[0]
+    assert [row["created_at"] for row in rows] == sorted(row["created_at"] for row in rows)
+
+@pytest.mark.asyncio
+async def test_export_users_csv_with_filters(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/export", params={"format": "csv", "role": "ADMIN"}, headers=headers)
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,nickname,email")
+    assert len(lines) == 2
+    assert ",ADMIN," in lines[1]
+
+@pytest.mark.asyncio
+async def test_export_users_requires_admin(async_client, manager_token):
+    response = await async_client.get("/users/export", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_get_user_conditional(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+    # A trimmed representation has its own tag, so the full one does not validate it.
+    response = await async_client.get(f"/users/{admin_user.id}", params={"fields": "id,email"}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    response = await async_client.get(f"/users/{admin_user.id}", params={"links": "false"}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+
+@pytest.mark.asyncio
+async def test_get_user_conditional_cache_miss_reads_only_version(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["etag"]
+    user_cache.clear()
+    with patch.object(UserService, "get_cached", wraps=UserService.get_cached) as get_cached:
+        response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert get_cached.call_count == 0
+        assert user_cache.stats()["size"] == 0
+
+        response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert get_cached.call_count == 1
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/users/{admin_user.id}"  # the 412 rolls back and expires the fixture's attributes
+    etag = (await async_client.get(url, headers=headers)).headers["etag"]
+
+    response = await async_client.put(url, json={"first_name": "First"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    response = await async_client.put(url, json={"first_name": "Second"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+
+    response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "First"
+
+@pytest.mark.asyncio
+async def test_search_users(async_client, admin_user, manager_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/search", params={"q": "john doe", "limit": 1}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == 1
+    first = body["items"][0]
+    assert "<mark>" in first["highlight"] and first["links"]
+    next_link = next(link["href"] for link in body["links"] if link["rel"] == "next")
+
+    response = await async_client.get(next_link, headers=headers)
+    body = response.json()
+    assert [item["id"] for item in body["items"]] != [first["id"]]
+    assert {first["nickname"], body["items"][0]["nickname"]} == {"admin_user", "manager_john"}
+    assert not any(link["rel"] == "next" for link in body["links"])
+
+    response = await async_client.get("/users/search", params={"q": "john", "cursor": "bogus"}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_user_after_write_bypasses_cache(async_client, db_session, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/users/{admin_user.id}"
+    assert (await async_client.get(url, headers=headers)).json()["first_name"] == "John"
+    await db_session.execute(text("UPDATE users SET first_name = 'Jane' WHERE id = :id"), {"id": admin_user.id})
+    await db_session.commit()  # written through another worker, whose invalidation this one never sees
+
+    assert (await async_client.get(url, headers=headers)).json()["first_name"] == "John"
+    pinned = {**headers, "cookie": f"{COOKIE_NAME}={time.time() + 5}"}
+    assert (await async_client.get(url, headers=pinned)).json()["first_name"] == "Jane"
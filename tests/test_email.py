@@ -2,13 +2,13 @@ import pytest
 from unittest.mock import patch, MagicMock
 from app.services.email_service import EmailService
 from app.utils.template_manager import TemplateManager
-from app.utils.smtp_connection import SMTPClient
+from app.utils.smtp_connection import AsyncSMTPClient
 
 @pytest.fixture
 def mock_email_service():
     template_manager = TemplateManager()
     # Create a mock for the SMTP client
-    with patch.object(SMTPClient, 'send_email') as mock_send:
+    with patch.object(AsyncSMTPClient, 'send_email') as mock_send:
         mock_send.return_value = True
         email_service = EmailService(template_manager=template_manager)
         # Replace the real SMTP client with our mock
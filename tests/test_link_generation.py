@@ -6,7 +6,7 @@ from uuid import uuid4
 import pytest
 from fastapi import Request
 
-from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links
+from app.utils.link_generation import create_link, create_pagination_link, create_user_links, generate_pagination_links, user_link_templates
 
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
@@ -49,3 +49,17 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_user_link_templates_resolve_routes_once(mock_request):
+    templates = user_link_templates(mock_request)
+    assert user_link_templates(mock_request) is templates
+    create_user_links(uuid4(), mock_request)
+    assert mock_request.url_for.call_count == 3
+    user_id = uuid4()
+    assert [link["href"] for link in templates.for_user(user_id)] == [
+        f"http://testserver/{action}/{user_id}" for action in ("get_user", "update_user", "delete_user")
+    ]
+
+def test_generate_pagination_links_carries_params(mock_request):
+    links = generate_pagination_links(mock_request, 0, 5, 50, {"links": "false"})
+    assert all(str(link.href).endswith("&links=false") for link in links)
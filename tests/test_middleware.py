@@ -0,0 +1,117 @@
+import time
+import pytest
+from fastapi import Depends, FastAPI, Request
+from httpx import AsyncClient
+from app.middleware.rate_limit import Rate, RateLimitMiddleware, SharedBuckets
+from app.middleware.read_your_writes import COOKIE_NAME, ReadYourWritesMiddleware
+from app.services.jwt_service import create_access_token
+from settings.config import override_settings
+
+@pytest.fixture
+def rw_app():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    async def write(request: Request):
+        request.state.db_wrote = True
+        return {}
+
+    @app.get("/read")
+    async def read(request: Request):
+        return {"primary": request.state.read_primary}
+
+    return app
+
+async def test_write_pins_client_to_primary(rw_app):
+    async with AsyncClient(app=rw_app, base_url="http://testserver") as client:
+        assert (await client.get("/read")).json() == {"primary": False}
+        response = await client.post("/write")
+        assert COOKIE_NAME in response.cookies
+        assert (await client.get("/read")).json() == {"primary": True}
+
+async def test_expired_or_garbled_cookie_reads_from_replica(rw_app):
+    async with AsyncClient(app=rw_app, base_url="http://testserver") as client:
+        expired = await client.get("/read", headers={"cookie": f"{COOKIE_NAME}={time.time() - 1}"})
+        garbled = await client.get("/read", headers={"cookie": f"{COOKIE_NAME}=soon"})
+    assert expired.json() == {"primary": False}
+    assert garbled.json() == {"primary": False}
+
+async def test_reads_do_not_set_cookie(rw_app):
+    async with AsyncClient(app=rw_app, base_url="http://testserver") as client:
+        response = await client.get("/read")
+    assert COOKIE_NAME not in response.cookies
+
+def test_shared_buckets_are_shared_between_handles(tmp_path):
+    path = str(tmp_path / "buckets")
+    first, second = SharedBuckets(path, 64), SharedBuckets(path, 16)
+    rate = Rate(2, 10.0)
+    assert second.slots == 64  # the file is never shrunk
+    assert first.take([("ip:a", rate)], now=100.0) == 0
+    assert second.take([("ip:a", rate)], now=100.0) == 0
+    assert first.take([("ip:a", rate)], now=100.0) == pytest.approx(5.0)
+    assert second.take([("ip:a", rate)], now=105.0) == 0  # one token refilled
+    assert first.take([("ip:b", rate)], now=105.0) == 0
+    first.close()
+    second.close()
+
+def test_shared_buckets_take_all_or_nothing(tmp_path):
+    buckets = SharedBuckets(str(tmp_path / "buckets"), 64)
+    assert buckets.take([("account:x", Rate(1, 60.0))], now=0.0) == 0
+    assert buckets.take([("ip:a", Rate(5, 60.0)), ("account:x", Rate(1, 60.0))], now=0.0) > 0
+    # The denied request did not spend from the IP bucket.
+    assert [buckets.take([("ip:a", Rate(5, 60.0))], now=0.0) for _ in range(5)] == [0] * 5
+
+def test_shared_buckets_reuse_the_stalest_slot_when_full(tmp_path):
+    buckets = SharedBuckets(str(tmp_path / "buckets"), 4)
+    rate = Rate(1, 60.0)
+    for i in range(4):
+        assert buckets.take([(f"ip:{i}", rate)], now=float(i)) == 0
+    assert buckets.take([("ip:new", rate)], now=10.0) == 0
+    assert buckets.take([("ip:0", rate)], now=10.0) == 0  # evicted, so it starts full again
+    assert buckets.take([("ip:3", rate)], now=10.0) > 0
+
+@pytest.fixture
+def limited_app(tmp_path):
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+    calls = []
+
+    @app.post("/login/")
+    async def login(request: Request):
+        calls.append((await request.body()).decode())
+        return {}
+
+    @app.get("/read")
+    async def read():
+        calls.append("read")
+        return {}
+
+    with override_settings(rate_limit_store=str(tmp_path / "rate-limits"), rate_limit_auth_ip="4/60",
+                           rate_limit_auth_account="2/60", rate_limit_read="3/60"):
+        yield app, calls
+
+async def test_login_limited_per_account_before_the_handler(limited_app):
+    app, calls = limited_app
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        statuses = [(await client.post("/login/", data={"username": "Ada@example.com", "password": "x"})).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        response = await client.post("/login/", data={"username": "ada@example.com", "password": "x"})
+        assert response.status_code == 429 and 1 <= int(response.headers["retry-after"]) <= 30
+        # Another account has its own bucket, until the IP bucket runs out too.
+        assert (await client.post("/login/", data={"username": "bob@example.com", "password": "x"})).status_code == 200
+        assert (await client.post("/login/", data={"username": "eve@example.com", "password": "x"})).status_code == 200
+        assert (await client.post("/login/", data={"username": "carl@example.com", "password": "x"})).status_code == 429
+    # The handler still saw the full body, and never saw a rejected request.
+    assert calls == ["username=Ada%40example.com&password=x"] * 2 + ["username=bob%40example.com&password=x", "username=eve%40example.com&password=x"]
+
+async def test_reads_limited_per_account_and_ip(limited_app):
+    app, calls = limited_app
+    token = create_access_token(data={"sub": "ada@example.com", "role": "ADMIN"})
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        assert [(await client.get("/read", headers=headers)).status_code for _ in range(4)] == [200, 200, 200, 429]
+        # The IP bucket is spent as well; a disabled limiter lets everything through.
+        assert (await client.get("/read")).status_code == 429
+        with override_settings(rate_limit_enabled=False):
+            assert (await client.get("/read")).status_code == 200
@@ -150,3 +150,9 @@ async def test_update_user_role(db_session: AsyncSession, user: User):
     await db_session.commit()
     await db_session.refresh(user)
     assert user.role == UserRole.ADMIN, "Role update should persist correctly in the database"
+
+def test_search_vector_matches_its_migration():
+    """The generated column is NOT NULL in the e7b3f05d92a4 migration; the model must agree."""
+    column = User.__table__.c.search_vector
+    assert not column.nullable
+    assert column.computed is not None and column.computed.persisted
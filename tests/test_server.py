@@ -0,0 +1,38 @@
+import runpy
+import sys
+from unittest.mock import patch
+from app.server import AppWorker, Server, server_options
+from app.dependencies import get_settings
+from settings.config import override_settings
+
+def test_server_options_from_settings():
+    with override_settings(server_workers=3, server_port=9000, server_max_requests=500, server_max_requests_jitter=50) as settings:
+        options = server_options(settings)
+    assert options["workers"] == 3
+    assert options["bind"] == "0.0.0.0:9000"
+    assert options["worker_class"] == "app.server.AppWorker"
+    assert options["preload_app"] is True
+    assert (options["max_requests"], options["max_requests_jitter"]) == (500, 50)
+
+def test_server_loads_gunicorn_config():
+    with override_settings(server_workers=2) as settings:
+        server = Server(server_options(settings))
+    assert server.cfg.workers == 2
+    assert server.cfg.worker_class is AppWorker
+    assert server.cfg.max_requests == 10000
+    assert AppWorker.CONFIG_KWARGS["loop"] == "uvloop" and AppWorker.CONFIG_KWARGS["http"] == "httptools"
+
+def test_server_runs_as_a_script():
+    # Under `python -m app.server` the module is __main__; workers must still import app.server.
+    with patch.object(sys, "argv", ["app.server"]), patch("gunicorn.app.base.BaseApplication.run") as run:
+        namespace = runpy.run_module("app.server", run_name="__main__")
+    assert run.called
+    assert namespace["server_options"](namespace["get_settings"]())["worker_class"] == "app.server.AppWorker"
+
+def test_sighup_reloads_settings_in_the_master(monkeypatch):
+    with override_settings() as before:
+        server = Server(server_options(before))
+        monkeypatch.setenv("SERVER_MAX_REQUESTS", "123")
+        server.cfg.on_reload(None)  # what the arbiter runs on SIGHUP, before forking new workers
+        assert get_settings() is not before
+        assert get_settings().server_max_requests == 123
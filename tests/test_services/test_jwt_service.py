@@ -1,8 +1,10 @@
 import pytest
 import jwt
+import time
 from datetime import datetime, timedelta
-from app.services.jwt_service import create_access_token, decode_token
+from app.services.jwt_service import TokenCache, create_access_token, decode_token, token_cache
 from app.dependencies import get_settings
+from settings.config import override_settings
 
 settings = get_settings()
 
@@ -95,3 +97,36 @@ def test_decode_token_malformed():
     
     decoded = decode_token(malformed_token)
     assert decoded is None
+
+def test_decode_token_is_served_from_cache():
+    token_cache.clear()
+    token = create_access_token(data={"sub": "cached@example.com", "role": "ADMIN"})
+    first = decode_token(token)
+    second = decode_token(token)
+    assert first == second
+    assert token_cache.stats()["hits"] == 1
+    assert token_cache.stats()["misses"] == 1
+
+def test_token_cache_entry_expires_at_exp():
+    cache = TokenCache()
+    key = TokenCache.key("token", "secret")
+    cache.set(key, {"sub": "a", "exp": time.time() - 1}, maxsize=10)
+    assert cache.get(key) is None
+    assert cache.stats()["size"] == 0
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache()
+    exp = time.time() + 60
+    keys = [TokenCache.key(f"token-{i}", "secret") for i in range(3)]
+    cache.set(keys[0], {"exp": exp}, maxsize=2)
+    cache.set(keys[1], {"exp": exp}, maxsize=2)
+    cache.get(keys[0])
+    cache.set(keys[2], {"exp": exp}, maxsize=2)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+def test_cached_token_rejected_after_secret_change():
+    token = create_access_token(data={"sub": "cached@example.com", "role": "ADMIN"})
+    assert decode_token(token) is not None
+    with override_settings(jwt_secret_key="rotated-secret"):
+        assert decode_token(token) is None
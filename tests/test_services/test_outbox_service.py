@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import select, update
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.outbox_service import OutboxService
+from app.services.user_service import UserService
+from settings.config import override_settings
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def sending_email_service():
+    email_service = MagicMock()
+    email_service.send_user_email = AsyncMock()
+    email_service.verification_email_data = MagicMock(side_effect=lambda user: {"name": user.first_name, "verification_url": "http://localhost/verify", "email": user.email})
+    return email_service
+
+async def queue_emails(db_session, count):
+    for i in range(count):
+        OutboxService.enqueue(db_session, 'email_verification', {"name": "Test", "verification_url": "http://localhost/verify", "email": f"queued{i}@example.com"})
+    await db_session.commit()
+
+async def fetch_outbox(db_session):
+    db_session.expire_all()
+    result = await db_session.execute(select(EmailOutbox).order_by(EmailOutbox.recipient))
+    return result.scalars().all()
+
+# Test registration queues the verification email instead of sending it
+async def test_create_user_queues_verification_email(db_session, sending_email_service):
+    user = await UserService.create(db_session, {"email": "outbox_user@example.com", "password": "ValidPassword123!"}, sending_email_service)
+    assert user is not None
+    user_id = user.id
+    sending_email_service.send_user_email.assert_not_called()
+    messages = await fetch_outbox(db_session)
+    assert len(messages) == 1
+    assert messages[0].recipient == "outbox_user@example.com"
+    assert messages[0].user_id == user_id
+    assert messages[0].status == OutboxStatus.PENDING
+
+# Test a dispatch sends every due email and marks it sent
+async def test_dispatch_batch_sends_pending(db_session, sending_email_service):
+    await queue_emails(db_session, 3)
+    claimed = await OutboxService.dispatch_batch(db_session, sending_email_service)
+    assert claimed == 3
+    assert sending_email_service.send_user_email.await_count == 3
+    messages = await fetch_outbox(db_session)
+    assert all(message.status == OutboxStatus.SENT and message.attempts == 1 for message in messages)
+    assert await OutboxService.dispatch_batch(db_session, sending_email_service) == 0
+
+# Test claims respect the batch size and hide claimed rows from the next claim
+async def test_claim_batch_leases_rows(db_session):
+    await queue_emails(db_session, 5)
+    first = await OutboxService.claim_batch(db_session, 3)
+    second = await OutboxService.claim_batch(db_session, 3)
+    assert len(first) == 3
+    assert len(second) == 2
+    assert {m.id for m in first}.isdisjoint(m.id for m in second)
+
+# Test failures are recorded, rescheduled and eventually marked failed
+async def test_dispatch_batch_records_failures(db_session, sending_email_service):
+    sending_email_service.send_user_email.side_effect = ConnectionError("SMTP down")
+    await queue_emails(db_session, 1)
+
+    assert await OutboxService.dispatch_batch(db_session, sending_email_service) == 1
+    message = (await fetch_outbox(db_session))[0]
+    assert message.status == OutboxStatus.PENDING
+    assert message.attempts == 1
+    assert message.last_error == "SMTP down"
+    # Not due again until the backoff passes.
+    assert await OutboxService.dispatch_batch(db_session, sending_email_service) == 0
+
+    await db_session.execute(update(EmailOutbox).values(available_at=EmailOutbox.created_at))
+    await db_session.commit()
+    with override_settings(outbox_max_attempts=2):
+        assert await OutboxService.dispatch_batch(db_session, sending_email_service) == 1
+    message = (await fetch_outbox(db_session))[0]
+    assert message.status == OutboxStatus.FAILED
+    assert message.attempts == 2
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from app.services.password_service import HashLane, PasswordHasher, PasswordHashingBusy, hash_workers
+from settings.config import override_settings
+from app.utils.security import hash_password
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=2, queue_size=4, timeout=10)
+    yield hasher
+    hasher.shutdown()
+
+async def test_hash_and_verify_round_trip(hasher):
+    hashed = await hasher.hash("MySuperPassword$1234")
+    assert hashed.startswith('$2b$')
+    assert await hasher.verify("MySuperPassword$1234", hashed) is True
+    assert await hasher.verify("WrongPassword$1234", hashed) is False
+
+async def test_verify_matches_sync_hash(hasher):
+    hashed = hash_password("secure_password")
+    assert await hasher.verify("secure_password", hashed) is True
+
+async def test_verify_invalid_hash_raises(hasher):
+    with pytest.raises(ValueError):
+        await hasher.verify("secure_password", "invalid_hash_format")
+
+async def test_login_waiters_served_before_registration():
+    hasher = PasswordHasher(workers=2, queue_size=4)
+    await hasher._acquire(HashLane.LOGIN)
+    await hasher._acquire(HashLane.LOGIN)
+    order = []
+
+    async def wait_for_slot(lane):
+        await hasher._acquire(lane)
+        order.append(lane)
+
+    registration = asyncio.create_task(wait_for_slot(HashLane.REGISTRATION))
+    await asyncio.sleep(0)
+    login = asyncio.create_task(wait_for_slot(HashLane.LOGIN))
+    await asyncio.sleep(0)
+    hasher._release(HashLane.LOGIN)
+    await login
+    hasher._release(HashLane.LOGIN)
+    await registration
+    assert order == [HashLane.LOGIN, HashLane.REGISTRATION]
+
+async def test_registration_share_is_capped():
+    hasher = PasswordHasher(workers=2, queue_size=4, registration_share=0.5)
+    await hasher._acquire(HashLane.REGISTRATION)
+    waiting = asyncio.create_task(hasher._acquire(HashLane.REGISTRATION))
+    await asyncio.sleep(0)
+    assert hasher.queued() == 1
+    # A login still gets the free worker while registration is held back.
+    await hasher._acquire(HashLane.LOGIN)
+    waiting.cancel()
+
+async def test_full_queue_raises_busy():
+    hasher = PasswordHasher(workers=2, queue_size=1)
+    await hasher._acquire(HashLane.LOGIN)
+    await hasher._acquire(HashLane.LOGIN)
+    waiting = asyncio.create_task(hasher._acquire(HashLane.LOGIN))
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHashingBusy):
+        await hasher._acquire(HashLane.LOGIN)
+    waiting.cancel()
+
+async def test_queue_timeout_raises_busy():
+    hasher = PasswordHasher(workers=2, queue_size=4, timeout=0.05)
+    await hasher._acquire(HashLane.LOGIN)
+    await hasher._acquire(HashLane.LOGIN)
+    with pytest.raises(PasswordHashingBusy):
+        await hasher.verify("secure_password", hash_password("secure_password", rounds=4))
+    assert hasher.queued() == 0
+
+def test_hash_workers_split_cores_across_server_workers(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    with override_settings(password_hash_workers=0, server_workers=0) as settings:
+        assert hash_workers(settings) == 2  # 17 server workers on 8 cores
+    with override_settings(password_hash_workers=0, server_workers=2) as settings:
+        assert hash_workers(settings) == 4
+    with override_settings(password_hash_workers=3, server_workers=2) as settings:
+        assert hash_workers(settings) == 3
+    with override_settings(password_hash_workers=1, server_workers=2) as settings:
+        assert hash_workers(settings) == 2
+
+def test_registration_always_leaves_a_login_worker():
+    assert PasswordHasher(workers=1).workers == 2
+    assert PasswordHasher(workers=2, registration_share=0.9).registration_slots == 1
+    assert PasswordHasher(workers=8, registration_share=0.5).registration_slots == 4
+    assert PasswordHasher(workers=2, registration_share=1).registration_slots == 2
+
+async def test_login_granted_while_registration_hashes_with_defaults(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    with override_settings(password_hash_workers=0, server_workers=0) as settings:
+        hasher = PasswordHasher(
+            workers=hash_workers(settings),
+            queue_size=settings.password_hash_queue_size,
+            timeout=settings.password_hash_timeout,
+            registration_share=settings.password_hash_registration_share,
+        )
+    await hasher._acquire(HashLane.REGISTRATION)
+    waiting = asyncio.create_task(hasher._acquire(HashLane.REGISTRATION))
+    await asyncio.sleep(0)
+    # The second registration waits, but the login is granted at once.
+    await asyncio.wait_for(hasher._acquire(HashLane.LOGIN), 0.1)
+    assert hasher.queued() == 1
+    waiting.cancel()
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import select
+from app.models.refresh_token_model import RefreshToken
+from app.services.jwt_service import create_access_token
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+async def _issue(db_session, user):
+    token = RefreshTokenService.issue(db_session, user.id)
+    await db_session.commit()
+    return token
+
+async def test_rotate_returns_user_and_new_token(db_session, verified_user):
+    token = await _issue(db_session, verified_user)
+    rotated = await RefreshTokenService.rotate(db_session, token)
+    assert rotated is not None
+    user, new_token = rotated
+    assert user.email == verified_user.email
+    assert user.role == verified_user.role
+    assert new_token != token
+
+async def test_reused_token_revokes_family(db_session, verified_user):
+    token = await _issue(db_session, verified_user)
+    _, successor = await RefreshTokenService.rotate(db_session, token)
+    assert await RefreshTokenService.rotate(db_session, token) is None
+    assert await RefreshTokenService.rotate(db_session, successor) is None
+    result = await db_session.execute(select(RefreshToken).where(RefreshToken.user_id == verified_user.id))
+    assert all(record.revoked_at is not None for record in result.scalars())
+
+async def test_rotate_rejects_access_token(db_session, verified_user):
+    access_token = create_access_token(data={"sub": verified_user.email, "role": verified_user.role.name})
+    assert await RefreshTokenService.rotate(db_session, access_token) is None
+
+async def test_rotate_rejects_locked_user(db_session, verified_user):
+    token = await _issue(db_session, verified_user)
+    verified_user.is_locked = True
+    await db_session.commit()
+    assert await RefreshTokenService.rotate(db_session, token) is None
+
+async def test_revoke_ends_session(db_session, verified_user):
+    token = await _issue(db_session, verified_user)
+    assert await RefreshTokenService.revoke(db_session, token) is True
+    assert await RefreshTokenService.rotate(db_session, token) is None
+
+async def test_reset_password_revokes_refresh_tokens(db_session, verified_user):
+    token = await _issue(db_session, verified_user)
+    assert await UserService.reset_password(db_session, verified_user.id, "NewPassword123!") is True
+    assert await RefreshTokenService.rotate(db_session, token) is None
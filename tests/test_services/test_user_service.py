@@ -1,11 +1,22 @@
 from builtins import range
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
-from sqlalchemy import select
+from sqlalchemy import inspect, select, text
+from sqlalchemy.dialects import postgresql
+from app.database import Database
 from app.dependencies import get_settings
-from app.models.user_model import User
-from app.services.user_service import UserService
-from app.utils.smtp_connection import SMTPClient
+from settings.config import override_settings
+from app.models.email_outbox_model import EmailOutbox
+from app.models.user_model import SEARCH_CONFIG, User, UserRole
+from app.schemas.pagination_schema import CountStrategy
+from app.schemas.user_schemas import UserSort
+from app.services.password_service import bulk_password_hasher
+from app.services.user_service import CachedUser, LoginOutcome, UserService, user_cache, user_count_cache
+from app.utils.cursor import Cursor, RankCursor
+from app.utils.smtp_connection import AsyncSMTPClient
 from app.services.email_service import EmailService
 from app.utils.template_manager import TemplateManager
 
@@ -15,7 +26,7 @@ pytestmark = pytest.mark.asyncio
 def mock_email_service():
     template_manager = TemplateManager()
     # Create a mock for the SMTP client
-    with patch.object(SMTPClient, 'send_email') as mock_send:
+    with patch.object(AsyncSMTPClient, 'send_email') as mock_send:
         mock_send.return_value = True
         email_service = EmailService(template_manager=template_manager)
         # Replace the real SMTP client with our mock
@@ -124,6 +135,22 @@ async def test_register_user_with_invalid_data(db_session, mock_email_service):
     user = await UserService.register_user(db_session, user_data, mock_email_service)
     assert user is None
 
+async def test_allocate_nickname_skips_taken_candidates(db_session, user, monkeypatch):
+    monkeypatch.setattr("app.services.user_service.generate_nicknames", lambda count, digits: [user.nickname, "fresh_otter_1"])
+    assert await UserService.allocate_nickname(db_session) == "fresh_otter_1"
+
+async def test_create_retries_when_nickname_taken_concurrently(db_session, user, mock_email_service, monkeypatch):
+    candidates = iter([user.nickname, "fresh_otter_2"])
+
+    async def allocate(session):
+        return next(candidates)
+
+    monkeypatch.setattr(UserService, "allocate_nickname", allocate)
+    user_data = {"email": "racing_nickname@example.com", "password": "ValidPassword123!"}
+    created = await UserService.create(db_session, user_data, mock_email_service)
+    assert created is not None
+    assert created.nickname == "fresh_otter_2"
+
 # Test successful user login
 async def test_login_user_successful(db_session, verified_user):
     user_data = {
@@ -152,6 +179,31 @@ async def test_account_lock_after_failed_logins(db_session, verified_user):
     is_locked = await UserService.is_account_locked(db_session, verified_user.email)
     assert is_locked, "The account should be locked after the maximum number of failed login attempts."
 
+async def test_attempt_login_outcomes(db_session, verified_user, locked_user, unverified_user):
+    outcome, user = await UserService.attempt_login(db_session, verified_user.email, "MySuperPassword$1234")
+    assert outcome is LoginOutcome.SUCCESS
+    assert user.id == verified_user.id
+    assert user.last_login_at is not None
+    assert (await UserService.attempt_login(db_session, locked_user.email, "MySuperPassword$1234"))[0] is LoginOutcome.LOCKED
+    assert (await UserService.attempt_login(db_session, unverified_user.email, "MySuperPassword$1234"))[0] is LoginOutcome.FAILED
+    assert (await UserService.attempt_login(db_session, "nobody@example.com", "MySuperPassword$1234"))[0] is LoginOutcome.FAILED
+
+async def test_concurrent_failed_logins_are_all_counted(db_session, verified_user):
+    attempts = get_settings().max_login_attempts
+    session_factory = Database.get_session_factory()
+
+    async def fail_once():
+        async with session_factory() as session:
+            await UserService.login_user(session, verified_user.email, "wrongpassword")
+
+    try:
+        await asyncio.gather(*(fail_once() for _ in range(attempts)))
+    finally:
+        await Database._engine.dispose()
+    await db_session.refresh(verified_user)
+    assert verified_user.failed_login_attempts == attempts
+    assert verified_user.is_locked
+
 # Test resetting a user's password
 async def test_reset_password(db_session, user):
     new_password = "NewPassword123!"
@@ -172,3 +224,282 @@ async def test_unlock_user_account(db_session, locked_user):
     assert unlocked, "The account should be unlocked"
     refreshed_user = await UserService.get_by_id(db_session, locked_user.id)
     assert not refreshed_user.is_locked, "The user should no longer be locked"
+
+# Test keyset pagination walks every user exactly once, forwards and backwards
+async def test_list_users_by_cursor(db_session, users_with_same_role_50_users):
+    seen = []
+    cursor = None
+    while True:
+        users, has_more = await UserService.list_users_by_cursor(db_session, limit=15, cursor=cursor)
+        seen.extend(user.id for user in users)
+        if not has_more:
+            break
+        cursor = Cursor(users[-1].created_at, users[-1].id)
+    assert len(seen) == 50
+    assert len(set(seen)) == 50
+
+    last = await UserService.list_users(db_session, skip=40, limit=10)
+    previous, has_more = await UserService.list_users_by_cursor(
+        db_session, limit=10, cursor=Cursor(last[0].created_at, last[0].id, backwards=True)
+    )
+    assert has_more
+    assert [user.id for user in previous] == seen[30:40]
+
+# Test fetching a page and the total in one query
+async def test_list_users_with_total(db_session, users_with_same_role_50_users):
+    users, total = await UserService.list_users_with_total(db_session, skip=10, limit=10)
+    assert len(users) == 10
+    assert total == 50
+    users, total = await UserService.list_users_with_total(db_session, skip=100, limit=10)
+    assert users == [] and total is None
+
+# Test each count strategy reports the strategy it actually used
+async def test_count_users_strategies(db_session, users_with_same_role_50_users):
+    user_count_cache.clear()
+    assert await UserService.count_users(db_session, CountStrategy.EXACT) == (50, CountStrategy.EXACT)
+    assert await UserService.count_users(db_session, CountStrategy.CACHED) == (50, CountStrategy.CACHED)
+    # A fresh table has no statistics, so the estimate falls back to an exact count.
+    assert await UserService.count_users(db_session, CountStrategy.ESTIMATED) == (50, CountStrategy.EXACT)
+
+# Test the cached count follows creates and deletes
+async def test_cached_count_tracks_create_and_delete(db_session, user, mock_email_service):
+    user_count_cache.clear()
+    assert await UserService.cached_count(db_session) == 1
+    created = await UserService.create(db_session, {"email": "cached_count@example.com", "password": "ValidPassword123!"}, mock_email_service)
+    assert await UserService.cached_count(db_session) == 2
+    await UserService.delete(db_session, created.id)
+    await UserService.delete(db_session, user.id)
+    assert await UserService.cached_count(db_session) == 0
+
+async def test_bulk_create_reports_each_row(db_session, user, mock_email_service):
+    rows = [
+        (1, {"email": "bulk_one@example.com", "password": "ValidPassword123!", "first_name": "One"}),
+        (2, {"email": "bulk_two@example.com", "password": "ValidPassword123!", "nickname": "bulk_two"}),
+        (3, {"email": "bulk_one@example.com", "password": "ValidPassword123!"}),
+        (4, {"email": user.email, "password": "ValidPassword123!"}),
+        (5, {"email": "not-an-email", "password": "ValidPassword123!"}),
+        (6, ValueError("Invalid JSON")),
+    ]
+    results = await UserService.bulk_create(db_session, rows, mock_email_service)
+    assert [result["row"] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert [result["status"] for result in results] == ["created", "created", "failed", "failed", "failed", "failed"]
+    assert "already registered" in results[3]["errors"][0]
+
+    created = await UserService.get_by_email(db_session, "bulk_two@example.com")
+    assert created.nickname and created.nickname != "bulk_two"
+    assert str(created.id) == results[1]["id"]
+    queued = await db_session.execute(select(EmailOutbox).where(EmailOutbox.user_id.in_([created.id])))
+    assert len(queued.scalars().all()) == 1
+
+async def test_create_and_bulk_create_allocate_nicknames_alike(db_session, mock_email_service, monkeypatch):
+    names = iter(["allocated_otter_1", "allocated_otter_2"])
+    monkeypatch.setattr("app.services.user_service.generate_nicknames", lambda count, digits: [next(names)])
+    created = await UserService.create(db_session, {"email": "single@example.com", "password": "ValidPassword123!", "nickname": "chosen_one"}, mock_email_service)
+    results = await UserService.bulk_create(db_session, [(1, {"email": "bulk@example.com", "password": "ValidPassword123!", "nickname": "chosen_one"})], mock_email_service)
+    assert results[0]["status"] == "created"
+    assert created.nickname == "allocated_otter_1"
+    assert (await UserService.get_by_email(db_session, "bulk@example.com")).nickname == "allocated_otter_2"
+
+async def test_stream_users_yields_batches(db_session, users_with_same_role_50_users):
+    batches = [batch async for batch in UserService.stream_users(db_session, 20)]
+    assert [len(batch) for batch in batches] == [20, 20, 10]
+    batches = [batch async for batch in UserService.stream_users(db_session, 20, email_verified=True)]
+    assert batches == []
+
+async def test_get_cached_serves_repeat_lookups(db_session, user):
+    first = await UserService.get_cached(db_session, "id", user.id)
+    assert isinstance(first, CachedUser)
+    assert first.email == user.email
+    assert await UserService.get_cached(db_session, "email", user.email) is first
+    assert await UserService.get_cached(db_session, "nickname", user.nickname) is first
+    assert user_cache.stats()["hits"] == 2
+    with pytest.raises(AttributeError):
+        first.email = "changed@example.com"
+
+async def test_get_cached_invalidated_by_writes(db_session, locked_user):
+    cached = await UserService.get_cached(db_session, "id", locked_user.id)
+    assert cached.is_locked
+    assert await UserService.unlock_user_account(db_session, locked_user.id)
+    assert not (await UserService.get_cached(db_session, "id", locked_user.id)).is_locked
+
+    await UserService.update(db_session, locked_user.id, {"email": "renamed@example.com"})
+    assert await UserService.get_cached(db_session, "email", cached.email) is None
+    assert (await UserService.get_cached(db_session, "email", "renamed@example.com")).id == locked_user.id
+
+    await UserService.delete(db_session, locked_user.id)
+    assert await UserService.get_cached(db_session, "id", locked_user.id) is None
+
+async def test_get_cached_fills_only_from_the_primary(db_session, user):
+    user_id = user.id
+    db_session.info["replica"] = True
+    try:
+        assert (await UserService.get_cached(db_session, "id", user_id)).id == user_id
+        assert user_cache.get("id", user_id) is None
+    finally:
+        del db_session.info["replica"]
+    cached = await UserService.get_cached(db_session, "id", user_id)
+    await db_session.execute(text("UPDATE users SET first_name = 'Changed' WHERE id = :id"), {"id": user_id})
+    await db_session.commit()  # as if written by another worker, which cannot invalidate this cache
+    assert (await UserService.get_cached(db_session, "id", user_id)) is cached
+    fresh = await UserService.get_cached(db_session, "id", user_id, refresh=True)
+    assert fresh.first_name == "Changed" and user_cache.get("id", user_id) is fresh
+
+async def test_login_invalidates_cached_user_after_commit(db_session, verified_user):
+    user_id, email = verified_user.id, verified_user.email
+    await UserService.get_cached(db_session, "id", user_id)
+    generation = user_cache.generation
+    assert (await UserService.attempt_login(db_session, email, "wrong"))[0] is LoginOutcome.FAILED
+    assert user_cache.generation == generation and user_cache.get("id", user_id) is not None
+    await db_session.commit()
+    assert user_cache.generation > generation and user_cache.get("id", user_id) is None
+
+    await UserService.get_cached(db_session, "id", user_id)
+    await UserService.attempt_login(db_session, email, "wrong")
+    await db_session.rollback()
+    await db_session.commit()
+    assert user_cache.get("id", user_id) is not None  # nothing changed, nothing dropped
+
+async def test_get_cached_respects_ttl_and_size(db_session, users_with_same_role_50_users):
+    with override_settings(user_cache_size=10, user_cache_ttl=0):
+        for user in users_with_same_role_50_users[:20]:
+            await UserService.get_cached(db_session, "id", user.id)
+        assert user_cache.stats()["size"] == 10
+        await UserService.get_cached(db_session, "id", users_with_same_role_50_users[19].id)
+        assert user_cache.stats()["hits"] == 0
+
+async def test_list_users_loads_only_requested_columns(db_session, users_with_same_role_50_users):
+    db_session.expunge_all()
+    users = await UserService.list_users(db_session, 0, 5, columns=("email", "role"))
+    assert len(users) == 5
+    assert {"bio", "hashed_password", "github_profile_url"} <= inspect(users[0]).unloaded
+    assert "email" not in inspect(users[0]).unloaded
+    users, _ = await UserService.list_users_by_cursor(db_session, 5, columns=("email",))
+    assert "created_at" not in inspect(users[0]).unloaded
+
+async def test_list_users_filters_and_sorts(db_session, users_with_same_role_50_users, admin_user, locked_user):
+    users = await UserService.list_users(db_session, 0, 100, role=UserRole.ADMIN)
+    assert [user.id for user in users] == [admin_user.id]
+    users = await UserService.list_users(db_session, 0, 100, is_locked=True, email_verified=False)
+    assert [user.id for user in users] == [locked_user.id]
+
+    users = await UserService.list_users(db_session, 0, 100, sort=UserSort.EMAIL_DESC)
+    assert [user.email for user in users] == sorted((user.email for user in users), reverse=True)
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    assert await UserService.list_users(db_session, 0, 100, created_after=future) == []
+    users, total = await UserService.list_users_with_total(db_session, 0, 5, role=UserRole.AUTHENTICATED, sort=UserSort.NICKNAME)
+    assert len(users) == 5 and total == await UserService.count(db_session, role=UserRole.AUTHENTICATED)
+
+async def test_count_users_with_filters_is_exact(db_session, users_with_same_role_50_users, admin_user, locked_user):
+    assert await UserService.count_users(db_session, CountStrategy.CACHED, role=UserRole.ADMIN) == (1, CountStrategy.EXACT)
+    assert await UserService.count_users(db_session, CountStrategy.ESTIMATED, is_locked=True) == (1, CountStrategy.EXACT)
+
+# 20,000 users whose flags and roles are skewed the way production's are: the filtered sides are rare.
+SEED_USERS = text("""
+    INSERT INTO users (id, nickname, email, hashed_password, role, email_verified, is_locked, is_professional,
+                       failed_login_attempts, created_at, updated_at, last_login_at)
+    SELECT gen_random_uuid(), 'seed_' || i, 'seed' || i || '@example.com', 'x',
+           (CASE WHEN i % 100 = 0 THEN 'ADMIN' WHEN i % 50 = 0 THEN 'MANAGER' ELSE 'AUTHENTICATED' END)::"UserRole",
+           i % 20 <> 0, i % 200 = 0, i % 25 = 0, 0,
+           now() - i * interval '10 minutes', now(),
+           CASE WHEN i % 3 = 0 THEN NULL ELSE now() - i * interval '7 minutes' END
+    FROM generate_series(1, 20000) AS i
+""")
+
+async def _plan(db_session, query) -> str:
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return "\n".join((await db_session.execute(text(f"EXPLAIN {sql}"))).scalars())
+
+async def test_every_filter_combination_has_an_index_plan(db_session):
+    await db_session.execute(SEED_USERS)
+    await db_session.execute(text("ANALYZE users"))
+    now = datetime.now(timezone.utc)
+    day = (now - timedelta(days=1), now)
+    # Each filter on its own, with the index that should serve it and the plan line showing
+    # the index applies the filter rather than a scan filtering rows. A last_login_at range is
+    # checked in its own order: sorted by created_at, Postgres rightly prefers walking that
+    # index and stopping at the limit.
+    groups = [
+        ({"role": UserRole.MANAGER}, UserSort.CREATED_AT, "ix_users_role_created_at_id", "Index Cond: (role = 'MANAGER'"),
+        ({"is_locked": True}, UserSort.CREATED_AT, "ix_users_locked_created_at_id", None),
+        ({"email_verified": False}, UserSort.CREATED_AT, "ix_users_unverified_created_at_id", None),
+        ({"is_professional": True}, UserSort.CREATED_AT, "ix_users_professional_created_at_id", None),
+        ({"created_after": day[0], "created_before": day[1]}, UserSort.CREATED_AT, "ix_users_created_at_id", "Index Cond: ((created_at >="),
+        ({"last_login_after": day[0], "last_login_before": day[1]}, UserSort.LAST_LOGIN_AT, "ix_users_last_login_at_id", "Index Cond: ((last_login_at >="),
+    ]
+    for filters, sort, index, condition in groups:
+        plan = await _plan(db_session, select(User.id).where(*UserService.filter_conditions(**filters)).order_by(*UserService._ordering(sort)).limit(10))
+        assert index in plan, (filters, plan)
+        if condition is not None:
+            assert condition in plan, (filters, plan)
+        else:  # partial index: its predicate is the filter, so nothing is left to recheck
+            assert "Filter:" not in plan, (filters, plan)
+
+    # With real statistics and sequential scans allowed, no combination under any sort
+    # falls back to reading the whole table.
+    for size in range(len(groups) + 1):
+        for combination in combinations(groups, size):
+            filters = {name: value for group, _, _, _ in combination for name, value in group.items()}
+            for sort in UserSort:
+                plan = await _plan(db_session, select(User.id).where(*UserService.filter_conditions(**filters)).order_by(*UserService._ordering(sort)).limit(10))
+                assert "Seq Scan" not in plan, (filters, sort, plan)
+
+async def _add_search_users(db_session, count):
+    users = [
+        User(nickname=f"searcher_{i}", first_name="Ada", last_name=f"Lovelace{i}", email=f"searcher{i}@example.com",
+             hashed_password="x", role=UserRole.AUTHENTICATED, bio=f"Writes about analytical engines, volume {i}.")
+        for i in range(count)
+    ]
+    users.append(User(nickname="engine_fan", first_name="Charles", last_name="Babbage", email="babbage@example.com",
+                      hashed_password="x", role=UserRole.AUTHENTICATED, bio="Builds difference engines & <b>analytical</b> ones."))
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+async def test_search_ranks_and_highlights(db_session, users_with_same_role_50_users):
+    await _add_search_users(db_session, 3)
+    rows, has_more = await UserService.search(db_session, "Babbage engines", 10)
+    assert [user.nickname for user, _, _ in rows] == ["engine_fan"] and not has_more
+    _, rank, highlight = rows[0]
+    assert "<mark>Babbage</mark>" in highlight and "&amp;" in highlight
+
+    rows, _ = await UserService.search(db_session, "engines", 10)
+    assert len(rows) == 4
+    ranks = [rank for _, rank, _ in rows]
+    assert ranks == sorted(ranks, reverse=True)
+    assert await UserService.search(db_session, "-engines engines", 10) == ([], False)
+
+async def test_search_pages_by_rank_cursor(db_session):
+    users = await _add_search_users(db_session, 7)
+    seen = []
+    cursor = None
+    while True:
+        rows, has_more = await UserService.search(db_session, "analytical", 3, cursor)
+        seen.extend(user.id for user, _, _ in rows)
+        if not has_more:
+            break
+        last_user, last_rank, _ = rows[-1]
+        cursor = RankCursor(last_rank, last_user.id)
+    assert len(seen) == len(set(seen)) == len(users)
+
+async def test_search_uses_the_gin_index(db_session):
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    sql = f"SELECT id FROM users WHERE search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', 'ada')"
+    plan = "\n".join((await db_session.execute(text(f"EXPLAIN {sql}"))).scalars())
+    assert "ix_users_search_vector" in plan, plan
+
+async def test_bulk_create_hashes_rows_in_parallel(db_session, mock_email_service, monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def slow_hash(password, lane):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "$2b$12$" + "x" * 53
+
+    monkeypatch.setattr(bulk_password_hasher, "hash", slow_hash)
+    rows = [(i, {"email": f"parallel_{i}@example.com", "password": "ValidPassword123!"}) for i in range(1, 7)]
+    results = await UserService.bulk_create(db_session, rows, mock_email_service)
+    assert all(result["status"] == "created" for result in results)
+    assert peak == min(len(rows), bulk_password_hasher.registration_slots) > 1
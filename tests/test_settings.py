@@ -0,0 +1,39 @@
+import pytest
+from pydantic import ValidationError
+from app.dependencies import get_settings
+from settings.config import override_settings, reload_settings
+
+def test_get_settings_returns_snapshot():
+    assert get_settings() is get_settings()
+
+def test_settings_snapshot_is_immutable():
+    with pytest.raises(ValidationError):
+        get_settings().max_login_attempts = 10
+
+def test_override_settings_restores_snapshot():
+    original = get_settings()
+    with override_settings(max_login_attempts=7) as overridden:
+        assert get_settings() is overridden
+        assert get_settings().max_login_attempts == 7
+    assert get_settings() is original
+
+def test_reload_settings_swaps_snapshot(monkeypatch):
+    original = get_settings()
+    monkeypatch.setenv("MAX_LOGIN_ATTEMPTS", "9")
+    try:
+        reloaded = reload_settings()
+        assert reloaded is not original
+        assert get_settings() is reloaded
+        assert reloaded.max_login_attempts == 9
+    finally:
+        monkeypatch.delenv("MAX_LOGIN_ATTEMPTS")
+        reload_settings()
+
+def test_invalid_count_strategy_fails_on_reload(monkeypatch):
+    monkeypatch.setenv("USER_COUNT_STRATEGY", "fastest")
+    try:
+        with pytest.raises(ValidationError):
+            reload_settings()
+    finally:
+        monkeypatch.delenv("USER_COUNT_STRATEGY")
+        reload_settings()
@@ -0,0 +1,41 @@
+import json
+import uuid
+from datetime import datetime
+import pytest
+from app.models.user_model import UserRole
+from app.utils.bulk_io import aiter_lines, csv_batch, iter_csv, iter_ndjson, ndjson_batch
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+@pytest.mark.asyncio
+async def test_aiter_lines_across_chunk_boundaries():
+    lines = await collect(aiter_lines(chunks(b"first\r\nsec", b"ond\n", b"\nlast")))
+    assert lines == ["first", "second", "", "last"]
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_reports_bad_lines_against_their_row():
+    records = await collect(iter_ndjson(chunks(b'{"email": "a@example.com"}\n\nnot json\n[1, 2]\n')))
+    assert records[0] == (1, {"email": "a@example.com"})
+    assert records[1][0] == 2 and isinstance(records[1][1], ValueError)
+    assert records[2][0] == 3 and isinstance(records[2][1], ValueError)
+
+@pytest.mark.asyncio
+async def test_iter_csv_uses_header_and_skips_empty_cells():
+    body = b'email,first_name,bio\na@example.com,Ann,"Likes\nnewlines"\nb@example.com,,\nc@example.com\n'
+    records = await collect(iter_csv(chunks(body)))
+    assert records[0] == (1, {"email": "a@example.com", "first_name": "Ann", "bio": "Likes\nnewlines"})
+    assert records[1] == (2, {"email": "b@example.com"})
+    assert records[2][0] == 3 and isinstance(records[2][1], ValueError)
+
+def test_batch_writers_render_plain_values():
+    row = (uuid.UUID(int=1), datetime(2024, 1, 2, 3, 4, 5), UserRole.ADMIN, None, "a,b")
+    columns = ["id", "at", "role", "bio", "name"]
+    assert json.loads(ndjson_batch(columns, [row])) == {
+        "id": "00000000-0000-0000-0000-000000000001", "at": "2024-01-02T03:04:05", "role": "ADMIN", "bio": None, "name": "a,b",
+    }
+    assert csv_batch([row]) == '00000000-0000-0000-0000-000000000001,2024-01-02T03:04:05,ADMIN,,"a,b"\n'
@@ -0,0 +1,36 @@
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from app.utils.cursor import Cursor, RankCursor, decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor, page_cursors
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 4, 20, 21, 20, 32, 839580, tzinfo=timezone.utc)
+    user_id = uuid4()
+    assert decode_cursor(encode_cursor(created_at, user_id)) == Cursor(created_at, user_id, False)
+    assert decode_cursor(encode_cursor(created_at, user_id, backwards=True)).backwards is True
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "eyJjIjoxfQ"])
+def test_decode_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+def test_rank_cursor_round_trip():
+    user_id = uuid4()
+    assert decode_rank_cursor(encode_rank_cursor(0.06079271, user_id)) == RankCursor(0.06079271, user_id)
+    with pytest.raises(ValueError):
+        decode_rank_cursor(encode_cursor(datetime.now(timezone.utc), user_id))
+
+def test_page_cursors():
+    items = [SimpleNamespace(created_at=datetime.now(timezone.utc), id=uuid4()) for _ in range(3)]
+    # First page with more rows: only a next cursor.
+    next_cursor, prev_cursor = page_cursors(items, None, True)
+    assert decode_cursor(next_cursor).id == items[-1].id
+    assert prev_cursor is None
+    # Page read backwards with nothing further back: only a next cursor.
+    position = Cursor(items[-1].created_at, items[-1].id, backwards=True)
+    next_cursor, prev_cursor = page_cursors(items, position, False)
+    assert next_cursor is not None and prev_cursor is None
+    # Middle page read forwards: both.
+    next_cursor, prev_cursor = page_cursors(items, Cursor(items[0].created_at, items[0].id), True)
+    assert decode_cursor(prev_cursor) == Cursor(items[0].created_at, items[0].id, True)
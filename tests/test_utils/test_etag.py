@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime, timezone
+from app.utils.etag import etag_matches, user_etag
+
+def test_user_etag_changes_with_updated_at():
+    user_id = uuid.uuid4()
+    first = user_etag(user_id, datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert first == user_etag(user_id, datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert first != user_etag(user_id, datetime(2024, 1, 2, tzinfo=timezone.utc))
+    assert first.startswith('"') and first.endswith('"')
+
+def test_user_etag_differs_per_representation():
+    user_id, updated_at = uuid.uuid4(), datetime(2024, 1, 1, tzinfo=timezone.utc)
+    full = user_etag(user_id, updated_at)
+    tags = {
+        full,
+        user_etag(user_id, updated_at, links=False),
+        user_etag(user_id, updated_at, ("email", "id")),
+        user_etag(user_id, updated_at, ("email", "id", "links")),
+        user_etag(user_id, updated_at, ("email", "id", "links"), links=False),
+    }
+    assert len(tags) == 5
+    # links=false changes nothing when links were not asked for.
+    assert user_etag(user_id, updated_at, ("email", "id"), links=False) == user_etag(user_id, updated_at, ("email", "id"))
+    assert user_etag(user_id, updated_at, None, True) == full
+
+def test_etag_matches_lists_wildcards_and_weak_tags():
+    etag = user_etag(uuid.uuid4(), None)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert not etag_matches(f"W/{etag}", etag, weak=False)
+    assert not etag_matches(None, etag)
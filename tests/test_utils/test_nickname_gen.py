@@ -0,0 +1,16 @@
+from app.schemas.user_schemas import validate_nickname
+from app.utils.nickname_gen import generate_nickname, generate_nicknames, nickname_space
+
+def test_generated_nicknames_pass_validation():
+    for digits in (1, 4, 6, 9):
+        nickname = generate_nickname(digits)
+        assert validate_nickname(nickname) == nickname
+        assert len(nickname) <= 30
+
+def test_generate_nicknames_are_distinct():
+    names = generate_nicknames(50)
+    assert len(names) == len(set(names)) == 50
+
+def test_nickname_space_grows_with_digits():
+    assert nickname_space(5) == nickname_space(4) * 10
+    assert nickname_space(4) > 25_000_000
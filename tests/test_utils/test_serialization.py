@@ -0,0 +1,50 @@
+import uuid
+import pytest
+import orjson
+from asyncpg.pgproto.pgproto import UUID as DriverUUID
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserResponse
+from app.utils.serialization import FastJSONResponse, parse_fields, user_to_dict, users_to_dicts
+
+def make_user(**overrides) -> User:
+    fields = {
+        "id": uuid.uuid4(),
+        "email": "john.doe@example.com",
+        "nickname": "clever_fox_1234",
+        "first_name": "John",
+        "last_name": None,
+        "bio": "Developer",
+        "profile_picture_url": "https://example.com/john.jpg",
+        "linkedin_profile_url": None,
+        "github_profile_url": "https://github.com/johndoe",
+        "role": UserRole.MANAGER,
+        "is_professional": True,
+    }
+    fields.update(overrides)
+    return User(**fields)
+
+def test_user_to_dict_renders_like_user_response():
+    user = make_user()
+    assert orjson.loads(orjson.dumps(user_to_dict(user))) == UserResponse.model_validate(user).model_dump(mode="json", exclude={"links"})
+
+def test_users_to_dicts_keeps_order():
+    users = [make_user(email=f"user{i}@example.com") for i in range(3)]
+    assert [item["email"] for item in users_to_dicts(users)] == ["user0@example.com", "user1@example.com", "user2@example.com"]
+
+def test_fast_json_response_encodes_driver_uuids():
+    user_id = uuid.uuid4()
+    body = FastJSONResponse(user_to_dict(make_user(id=DriverUUID(str(user_id))))).body
+    assert orjson.loads(body)["id"] == str(user_id)
+
+def test_parse_fields_validates_against_user_response():
+    assert parse_fields(None) is None
+    assert parse_fields("role, email,id,email") == ("email", "id", "role")
+    with pytest.raises(ValueError, match="hashed_password"):
+        parse_fields("id,hashed_password")
+    with pytest.raises(ValueError):
+        parse_fields(" , ")
+
+def test_user_to_dict_trims_to_fields():
+    user = make_user()
+    assert user_to_dict(user, fields=("email",)) == {"email": user.email}
+    assert user_to_dict(user, fields=("email", "id", "role")) == {"email": user.email, "id": user.id, "role": user.role}
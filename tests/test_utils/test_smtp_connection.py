@@ -1,92 +1,83 @@
+import asyncio
+import socket
 import pytest
-from unittest.mock import patch, MagicMock
-from app.utils.smtp_connection import SMTPClient
-import smtplib
+from aiosmtpd.controller import Controller
+from app.utils.smtp_connection import AsyncSMTPClient
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps every message and the client port it arrived on."""
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.peers.add(session.peer)
+        return '250 Message accepted for delivery'
+
+@pytest.fixture
+def smtp_sink():
+    handler = RecordingHandler()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+def make_async_client(port, **kwargs):
+    return AsyncSMTPClient(server="127.0.0.1", port=port, username="", password="", start_tls=False, sender="mailer@example.com", **kwargs)
 
 def test_init_client():
-    client = SMTPClient(
-        server="test.host.com",
-        port=587,
-        username="test_user",
-        password="test_pass"
-    )
-    
+    client = AsyncSMTPClient(server="test.host.com", port=587, username="test_user", password="test_pass")
     assert client.server == "test.host.com"
     assert client.port == 587
     assert client.username == "test_user"
     assert client.password == "test_pass"
+    assert client.sender == "test_user"
+
+async def test_async_client_sends_envelope_and_alternatives(smtp_sink):
+    handler, port = smtp_sink
+    client = make_async_client(port)
+    await client.send_email("Test Subject", "<p>Test content</p>", "recipient@example.com", text_content="Test content")
+    await client.close()
+    envelope = handler.messages[0]
+    assert envelope.mail_from == "mailer@example.com"
+    assert envelope.rcpt_tos == ["recipient@example.com"]
+    assert b"Subject: Test Subject" in envelope.content
+    assert b"text/plain" in envelope.content and b"text/html" in envelope.content
+
+async def test_async_client_reuses_pooled_connections(smtp_sink):
+    handler, port = smtp_sink
+    client = make_async_client(port, pool_size=2)
+    await asyncio.gather(*(
+        client.send_email("Subject", "<p>Content</p>", f"recipient{i}@example.com") for i in range(6)
+    ))
+    await client.send_email("Subject", "<p>Content</p>", "last@example.com")
+    await client.close()
+    assert len(handler.messages) == 7
+    assert len(handler.peers) <= 2
+    assert handler.messages[-1].rcpt_tos == ["last@example.com"]
 
-@patch('smtplib.SMTP')
-def test_send_email_success(mock_smtp):
-    # Setup mock
-    mock_instance = MagicMock()
-    mock_smtp.return_value.__enter__.return_value = mock_instance
-    
-    # Create client
-    client = SMTPClient(
-        server="test.host.com",
-        port=587,
-        username="test_user@example.com",
-        password="test_pass"
-    )
-    
-    # Test sending email
-    subject = "Test Subject"
-    html_content = "<p>Test content</p>"
-    to_email = "recipient@example.com"
-    
-    client.send_email(subject, html_content, to_email)
-    
-    # Verify method calls
-    mock_instance.starttls.assert_called_once()
-    mock_instance.login.assert_called_once_with("test_user@example.com", "test_pass")
-    mock_instance.sendmail.assert_called_once()
+async def test_async_client_retires_connection_after_max_messages(smtp_sink):
+    handler, port = smtp_sink
+    client = make_async_client(port, pool_size=1, max_messages=2)
+    for i in range(4):
+        await client.send_email("Subject", "<p>Content</p>", f"recipient{i}@example.com")
+    await client.close()
+    assert len(handler.messages) == 4
+    assert len(handler.peers) == 2
 
-@patch('smtplib.SMTP')
-def test_send_email_with_cc_bcc(mock_smtp):
-    # Setup mock
-    mock_instance = MagicMock()
-    mock_smtp.return_value.__enter__.return_value = mock_instance
-    
-    # Create client
-    client = SMTPClient(
-        server="test.host.com",
-        port=587,
-        username="test_user@example.com",
-        password="test_pass"
-    )
-    
-    # Test sending email (no cc/bcc support in implementation)
-    subject = "Test Subject"
-    html_content = "<p>Test content</p>"
-    to_email = "recipient@example.com"
-    
-    client.send_email(subject, html_content, to_email)
-    
-    # Verify method calls
-    mock_instance.sendmail.assert_called_once()
-    
-    # Verify the sendmail call
-    call_args = mock_instance.sendmail.call_args[0]
-    assert call_args[0] == "test_user@example.com"
-    assert call_args[1] == "recipient@example.com"
+async def test_async_client_recycles_idle_connections(smtp_sink):
+    handler, port = smtp_sink
+    client = make_async_client(port, pool_size=1, idle_timeout=0)
+    await client.send_email("Subject", "<p>Content</p>", "first@example.com")
+    await client.send_email("Subject", "<p>Content</p>", "second@example.com")
+    await client.close()
+    assert len(handler.peers) == 2
 
-@patch('smtplib.SMTP')
-def test_send_email_failure(mock_smtp):
-    # Setup mock to raise an exception
-    mock_smtp.return_value.__enter__.side_effect = smtplib.SMTPException("SMTP Error")
-    
-    # Create client
-    client = SMTPClient(
-        server="test.host.com",
-        port=587,
-        username="test_user@example.com",
-        password="test_pass"
-    )
-    
-    # Test sending email that raises an exception
-    with pytest.raises(Exception) as excinfo:
-        client.send_email("Subject", "<p>Content</p>", "recipient@example.com")
-    
-    # The exception is passed through directly from SMTPException
-    assert "SMTP Error" in str(excinfo.value)
+async def test_async_client_failure_raises():
+    client = make_async_client(1, timeout=1)
+    with pytest.raises(Exception):
+        await client.send_email("Subject", "<p>Content</p>", "recipient@example.com")
@@ -0,0 +1,56 @@
+import os
+import pytest
+from unittest.mock import patch
+import markdown2
+from app.utils.template_manager import TemplateManager
+
+@pytest.fixture
+def template_manager(tmp_path):
+    (tmp_path / 'header.md').write_text("# Welcome\n", encoding='utf-8')
+    (tmp_path / 'footer.md').write_text("Sincerely, [the team](#)\n", encoding='utf-8')
+    (tmp_path / 'greeting.md').write_text("Hello {name}, please [verify]({url}).\n", encoding='utf-8')
+    manager = TemplateManager()
+    manager.templates_dir = tmp_path
+    return manager
+
+def test_render_template_fills_and_escapes(template_manager):
+    html = template_manager.render_template('greeting', name="<Ann>", url="http://example.com/v?a=1&b=2")
+    assert 'Hello &lt;Ann&gt;,' in html
+    assert 'href="http://example.com/v?a=1&amp;b=2"' in html
+    assert '<h1 style=' in html
+
+def test_render_text_alternative(template_manager):
+    text = template_manager.render_text('greeting', name="<Ann>", url="http://example.com/v")
+    assert "Hello <Ann>, please verify: http://example.com/v." in text
+    assert "Sincerely, the team" in text
+    assert "<" not in text.replace("<Ann>", "")
+
+def test_markdown_runs_once_per_template(template_manager):
+    with patch('app.utils.template_manager.markdown2.markdown', wraps=markdown2.markdown) as markdown:
+        for i in range(5):
+            template_manager.render_template('greeting', name=f"user{i}", url="http://example.com")
+        TemplateManager.render_template(template_manager, 'greeting', name="again", url="http://example.com")
+    assert markdown.call_count == 1
+
+def test_changed_template_is_recompiled(template_manager):
+    assert "Hello Ann" in template_manager.render_template('greeting', name="Ann", url="http://example.com")
+    path = template_manager.templates_dir / 'greeting.md'
+    path.write_text("Goodbye {name}.\n", encoding='utf-8')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert "Goodbye Ann" in template_manager.render_template('greeting', name="Ann", url="http://example.com")
+
+def test_missing_context_raises(template_manager):
+    with pytest.raises(KeyError):
+        template_manager.render_template('greeting', name="Ann")
+
+def test_attribute_index_and_nested_fields(template_manager):
+    (template_manager.templates_dir / 'fields.md').write_text("Hi {user.name}, first: {items[0]}, [{code!r:>{width}}]\n", encoding='utf-8')
+
+    class Person:
+        name = "Ann"
+
+    context = dict(user=Person(), items=["apple"], code="a1", width=6)
+    expected = "Hi {user.name}, first: {items[0]}, [{code!r:>{width}}]".format(**context)
+    assert expected in template_manager.render_text('fields', **context)
+    assert "Hi Ann, first: apple, [  &#x27;a1&#x27;]" in template_manager.render_template('fields', **context)